@@ -0,0 +1,169 @@
+'''
+Aggregation computes summary values of the resource fields over the filtered
+queryset of a list view, which are returned in the top-level meta. All of the
+requested aggregates are computed with a single `aggregate()` query.
+
+ex::
+
+    class BookViewSet(viewsets.ResourceViewSet):
+        ...
+        aggregate_fields = ('pages', 'published')
+
+    GET /books?filter[author]=1&aggregate[pages]=sum,avg&aggregate[id]=count
+
+    {
+        "data": [...],
+        "meta": {
+            "aggregates": {
+                "id": {"count": 4},
+                "pages": {"sum": 1200, "avg": 300.0}
+            }
+        }
+    }
+
+The primary data is omitted with the `aggregate_only` param (ie, `?aggregate_only=true`),
+in which case the queryset is neither paginated nor fetched.
+'''
+import re
+from collections import OrderedDict
+from django.db.models import Avg, Count, Max, Min, Sum
+from json_api.exceptions import ErrorList, ParseError
+from json_api.utils import view_meta
+from json_api.utils.model_meta import is_to_many_lookup
+
+
+class BaseAggregation(object):
+
+    def get_aggregates(self, queryset, request, view=None):  # pragma: no cover
+        raise NotImplementedError('get_aggregates() must be implemented.')
+
+    def is_aggregate_only(self, request, view=None):  # pragma: no cover
+        raise NotImplementedError('is_aggregate_only() must be implemented.')
+
+
+class FieldAggregation(BaseAggregation):
+    """
+    Aggregates the resource fields that are listed in the view's `aggregate_fields`
+    attribute. It accepts a list of field names or the special keyword '__all__'.
+    Aggregation is disabled if the value is None (the default). The resource 'id'
+    may always be counted.
+    """
+    aggregate_regex = re.compile(r'^aggregate\[(?P<field>.+)\]$')
+    aggregate_only_param = 'aggregate_only'
+
+    functions = OrderedDict([
+        ('count', Count),
+        ('sum', Sum),
+        ('avg', Avg),
+        ('min', Min),
+        ('max', Max),
+    ])
+
+    def get_requested_aggregates(self, request):
+        """
+        Returns a map of {field: [function names]} for the request's aggregate params.
+        """
+        requested = OrderedDict()
+
+        for param, value in sorted(request.query_params.items()):
+            match = self.aggregate_regex.match(param)
+            if match is not None:
+                names = [name.strip() for name in value.split(',') if name.strip()]
+                requested[match.group('field')] = names
+
+        return requested
+
+    def get_aggregate_fields(self, view):
+        """
+        Returns the list of resource fields that are able to be aggregated.
+        """
+        aggregate_fields = getattr(view, 'aggregate_fields', None)
+        all_fields = list(view_meta.get_attribute_attnames(view).keys())
+
+        if aggregate_fields is None:
+            aggregate_fields = []
+
+        elif aggregate_fields == '__all__':
+            aggregate_fields = all_fields
+
+        # ensure that the aggregate fields are within the set of attributes
+        assert set(aggregate_fields).issubset(set(all_fields)), \
+            "'%s.aggregate_fields' must be valid resource attributes. Valid fields: %s" % \
+            (view.__class__.__name__, all_fields)
+
+        if 'id' not in aggregate_fields:
+            aggregate_fields = ['id'] + list(aggregate_fields)
+        return aggregate_fields
+
+    def translate_field(self, field, view):
+        """
+        Translate the resource field name to its model lookup.
+        """
+        if field == 'id':
+            return 'pk'
+
+        # serializer source may be '.' delimited across relationships
+        return view_meta.get_attribute_attnames(view)[field].replace('.', '__')
+
+    def validate(self, requested, queryset, view):
+        """
+        Raises an `ErrorList` for the invalid fields and function names.
+        """
+        aggregate_fields = self.get_aggregate_fields(view)
+        errors = []
+
+        for field, names in list(requested.items()):
+            parameter = 'aggregate[%s]' % field
+
+            lookup = self.translate_field(field, view) if field in aggregate_fields else None
+
+            # to-many values would be duplicated by the joins of other aggregates.
+            if lookup is None or is_to_many_lookup(queryset.model, lookup):
+                errors.append(ParseError(
+                    detail='`%s` is not a valid aggregate field.' % field,
+                    source={'parameter': parameter},
+                ))
+                continue
+
+            errors += [
+                ParseError(
+                    detail='`%s` is not a valid aggregate function.' % name,
+                    source={'parameter': parameter},
+                ) for name in names if name not in self.functions
+            ]
+
+        if errors:
+            raise ErrorList(errors=errors)
+
+    def get_aggregates(self, queryset, request, view=None):
+        """
+        Returns a map of {field: {function name: value}} for the requested
+        aggregates, or `None` if aggregates were not requested.
+        """
+        requested = self.get_requested_aggregates(request)
+        if not requested:
+            return None
+
+        self.validate(requested, queryset, view)
+
+        aliases, expressions = OrderedDict(), {}
+        for field, names in list(requested.items()):
+            lookup = self.translate_field(field, view)
+
+            for name in names:
+                alias = '_aggregate_%d' % len(expressions)
+                aliases[(field, name)] = alias
+                expressions[alias] = self.functions[name](lookup)
+
+        # ordering does not affect the aggregates
+        values = queryset.order_by().aggregate(**expressions)
+
+        aggregates = OrderedDict()
+        for (field, name), alias in list(aliases.items()):
+            aggregates.setdefault(field, OrderedDict())[name] = values[alias]
+
+        return aggregates
+
+    def is_aggregate_only(self, request, view=None):
+        value = request.query_params.get(self.aggregate_only_param, '')
+        return value.lower() in ('true', '1')
@@ -0,0 +1,221 @@
+'''
+Resource assembly builds resource objects inside the database, instead of
+building model instances and serializing their attributes in Python. The
+assembled resource objects are returned as pre-encoded `ResourceFragment`s.
+
+Assembly is only supported for simple views, whose serializer fields map
+directly onto model columns, and which use the default `get_resource_*`
+implementations. Views that are not supported fall back to the regular
+resource building pipeline.
+
+ex::
+
+    class AuthorViewSet(viewsets.ReadOnlyResourceViewSet):
+        ...
+        assembler_class = SQLiteResourceAssembler
+
+'''
+from django.core.urlresolvers import NoReverseMatch
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework import serializers
+from json_api.renderers import ResourceFragment
+
+
+class BaseAssembler(object):
+
+    def get_assembled_queryset(self, queryset, view):  # pragma: no cover
+        raise NotImplementedError('get_assembled_queryset() must be implemented.')
+
+    def get_resources(self, rows, view):  # pragma: no cover
+        raise NotImplementedError('get_resources() must be implemented.')
+
+
+# Placeholder for the resource id when building URL templates. The lookup
+# regex for a view may only accept digits.
+PLACEHOLDER = '8080808080808080808'
+
+
+class _Placeholder(object):
+    # Stands in for a model instance when building URL templates.
+    def __getattr__(self, name):
+        return PLACEHOLDER
+
+
+class SQLiteResourceAssembler(BaseAssembler):
+    """
+    Assembles resource objects with SQLite's `json_object()` (JSON1 extension),
+    including the resource links and relationship links. Relationship linkage is not
+    assembled, so requests that include related resources are not supported.
+    """
+    vendor = 'sqlite'
+    annotation = '_json_api_resource'
+
+    # Serializer fields whose representation is equal to the column value.
+    # Subclasses are excluded, as they may alter the representation.
+    column_fields = (
+        serializers.CharField, serializers.EmailField, serializers.SlugField,
+        serializers.URLField, serializers.IntegerField, serializers.FloatField,
+        serializers.DateField, serializers.ChoiceField,
+    )
+    boolean_fields = (serializers.BooleanField, serializers.NullBooleanField)
+
+    def get_assembled_queryset(self, queryset, view):
+        """
+        Returns a queryset of (pk, encoded resource object) rows, or `None` if
+        the view is not supported.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != self.vendor or view.get_subtypes():
+            return None
+
+        try:
+            sql, params = self.get_resource_sql(queryset.model, view, connection)
+        except NotImplementedError:
+            return None
+
+        return queryset \
+            .annotate(**{self.annotation: RawSQL(sql, params)}) \
+            .values_list('pk', self.annotation)
+
+    def get_resources(self, rows, view):
+        """
+        Returns the resource fragments for the assembled rows.
+        """
+        resource_type = view.get_primary_type()
+
+        return [
+            ResourceFragment(pk, resource_type, content.encode('utf-8'))
+            for pk, content in rows
+        ]
+
+    def get_resource_sql(self, model, view, connection):
+        """
+        Returns the (sql, params) for an expression that builds the resource
+        object for a row. Raises `NotImplementedError` if the resource cannot
+        be assembled.
+        """
+        opts = model._meta
+        table = connection.ops.quote_name(opts.db_table)
+
+        def column(name):
+            return '%s.%s' % (table, connection.ops.quote_name(name))
+
+        try:
+            id_column = column(opts.get_field(view.lookup_field).column)
+        except Exception:
+            if view.lookup_field != 'pk':
+                raise NotImplementedError
+            id_column = column(opts.pk.column)
+
+        members = [
+            ('id', id_column, []),
+            ('type', '%s', [view.get_primary_type()]),
+        ]
+
+        placeholder = _Placeholder()
+        pk_column = column(opts.pk.column)
+
+        try:
+            links = view.get_resource_links(placeholder)
+        except NoReverseMatch:
+            raise NotImplementedError
+        if links:
+            members.append(('links',) + self.get_links_sql(links, id_column))
+
+        attributes = self.get_attributes_sql(model, view, column)
+        if attributes[0]:
+            members.append(('attributes',) + attributes)
+
+        # relationship counts are not assembled
+        if view.get_counted_relationships():
+            raise NotImplementedError
+
+        relationships = []
+        for relname, rel in list(view.get_relationships().items()):
+            try:
+                links = view.get_relationship_links(rel, placeholder)
+            except NoReverseMatch:
+                raise NotImplementedError
+            if not links:
+                continue
+
+            sql, params = self.get_links_sql(links, pk_column)
+            relationships.append((relname, "json_object('links', " + sql + ")", params))
+
+        if relationships:
+            members.append(('relationships', ) + self.get_object_sql(relationships))
+
+        return self.get_object_sql(members)
+
+    def get_object_sql(self, members):
+        """
+        Returns the (sql, params) for a `json_object()` of the members, given
+        as a list of (name, sql, params).
+        """
+        sql, params = [], []
+        for name, member_sql, member_params in members:
+            sql.append('%s, ' + member_sql)
+            params += [name] + list(member_params)
+
+        return 'json_object(' + ', '.join(sql) + ')', params
+
+    def get_links_sql(self, links, id_column):
+        """
+        Returns the (sql, params) for a links object, where the placeholder
+        in each link is substituted by the id column.
+        """
+        members = []
+        for name, link in list(links.items()):
+            parts = link.split(PLACEHOLDER)
+
+            sql = ' || CAST(' + id_column + ' AS TEXT) || '
+            sql = sql.join(['%s'] * len(parts))
+            members.append((name, sql, parts))
+
+        return self.get_object_sql(members)
+
+    def get_attributes_sql(self, model, view, column):
+        """
+        Returns the (sql, params) for the attributes object.
+        """
+        opts = model._meta
+        serializer = view.get_serializer()
+
+        members = []
+        for name, field in list(serializer.fields.items()):
+            if getattr(field, 'write_only', False):
+                continue
+
+            try:
+                model_field = opts.get_field(field.source)
+            except Exception:
+                raise NotImplementedError
+
+            if not model_field.concrete:
+                raise NotImplementedError
+
+            field_class = type(field)
+            col = column(model_field.column)
+
+            if field_class in self.boolean_fields:
+                sql = (
+                    "CASE WHEN %s IS NULL THEN json('null') "
+                    "WHEN %s THEN json('true') ELSE json('false') END" % (col, col)
+                )
+
+            elif field_class is serializers.PrimaryKeyRelatedField and model_field.many_to_one:
+                sql = col
+
+            elif field_class in self.column_fields and not model_field.is_relation:
+                sql = col
+
+            else:
+                raise NotImplementedError
+
+            members.append((name, sql, []))
+
+        if not members:
+            return None, []
+        return self.get_object_sql(members)
+
@@ -1,5 +1,5 @@
 
-from json_api import viewsets
+from json_api import mixins, viewsets
 from json_api.utils.rels import rel
 
 from json_api.fantasy import serializers
@@ -27,7 +27,7 @@ class SeriesView(viewsets.ResourceViewSet):
     )
 
 
-class BookView(viewsets.ResourceViewSet):
+class BookView(mixins.QueryResourceMixin, viewsets.ResourceViewSet):
     queryset = models.Book.objects.all()
     serializer_class = serializers.BookSerializer
     include_rels = '__all__'
@@ -1,29 +1,113 @@
 
 import re
+from collections import OrderedDict
 from django.core.exceptions import ValidationError
+from django.db.models import Count, Max, Min
+from django.db.models.constants import LOOKUP_SEP
+from django.utils import six
 from rest_framework.filters import OrderingFilter
 from rest_framework_filters import backends, filterset
 from django_filters.filterset import STRICTNESS
 from json_api.exceptions import ErrorList, NotFound, ParseError, FilterValidationError
 from json_api.settings import api_settings
-from json_api.utils import view_meta
+from json_api import telemetry
+from json_api.utils import plans, view_meta
+from json_api.utils.model_meta import is_to_many_lookup
+
+
+def is_facet_lookup(lookup, name):
+    """
+    Returns whether the filter lookup filters the facet's field (eg, `author`,
+    `author__in` and `author.name` filter the 'author' facet).
+    """
+    prefixes = (name + LOOKUP_SEP, name + api_settings.PATH_DELIMITER)
+    return lookup == name or lookup.startswith(prefixes)
+
+
+def get_lookup_expr(lookup_filter):
+    """
+    Returns the lookup expression of a filter (eg, 'in'). The `lookup_type`
+    is renamed to `lookup_expr` in django-filter 0.13.
+    """
+    lookup_expr = getattr(lookup_filter, 'lookup_expr', None)
+    return lookup_expr or getattr(lookup_filter, 'lookup_type', None)
 
 
 class RelatedOrderingFilter(OrderingFilter):
     """
     Extends OrderingFilter to support ordering by fields in related resources.
 
+    Ordering by a to-many relationship orders by the minimum of the related
+    values (or the maximum, if descending), which avoids duplicate results.
+
     Adapated from:
     https://github.com/tomchristie/django-rest-framework/issues/1005
     """
     ordering_delimiter = api_settings.PATH_DELIMITER
 
-    def get_ordering(self, request, queryset, view):
-        ordering = super(RelatedOrderingFilter, self).get_ordering(request, queryset, view)
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+
         if ordering:
-            ordering = [self.translate_field(field, view) for field in ordering]
+            telemetry.record_shape(view, 'sort', ordering)
+            queryset, ordering = self.aggregate_ordering(queryset, ordering)
+            return queryset.order_by(*ordering)
+
+        return queryset
 
-        return ordering
+    def aggregate_ordering(self, queryset, ordering):
+        """
+        Replaces the to-many fields in the ordering with aggregate annotations.
+        Returns a tuple of (annotated queryset, ordering).
+        """
+        annotations, aggregated = {}, []
+
+        for index, field in enumerate(ordering):
+            descending = field.startswith('-')
+            path = field.lstrip('-')
+
+            if not is_to_many_lookup(queryset.model, path):
+                aggregated.append(field)
+                continue
+
+            alias = '_ordering_%d' % index
+            annotations[alias] = Max(path) if descending else Min(path)
+            aggregated.append('-%s' % alias if descending else alias)
+
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        return queryset, aggregated
+
+    def get_ordering_annotations(self, view):
+        """
+        Returns a map of {sort key: annotation} for the sort keys that are
+        provided by the view's other filter backends (eg, search relevance).
+        """
+        annotations = {}
+        for backend in getattr(view, 'filter_backends', None) or []:
+            # ordering filters provide the annotations, and do not define them.
+            if issubclass(backend, RelatedOrderingFilter):
+                continue
+
+            if hasattr(backend, 'get_ordering_annotations'):
+                annotations.update(backend().get_ordering_annotations(view))
+
+        return annotations
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        key = (self.ordering_param, params.strip() if params else None)
+
+        def build():
+            ordering = super(RelatedOrderingFilter, self).get_ordering(request, queryset, view)
+            if ordering:
+                ordering = [self.translate_field(field, view) for field in ordering]
+
+            return ordering
+
+        # the validated and translated ordering is cached per sort param
+        return plans.get_plan(view, key, build)
 
     def translate_field(self, field, view):
         """
@@ -33,6 +117,10 @@ class RelatedOrderingFilter(OrderingFilter):
         descending = field.startswith('-')
         field = field.lstrip('-')
 
+        annotations = self.get_ordering_annotations(view)
+        if field in annotations:
+            return '-%s' % annotations[field] if descending else annotations[field]
+
         # determine if this is a relationship path or an attribute
         try:
             field, related = field.split(self.ordering_delimiter, 1)
@@ -110,6 +198,9 @@ class RelatedOrderingFilter(OrderingFilter):
         """
         ordering_fields = self.get_ordering_fields(view)
 
+        if field in self.get_ordering_annotations(view):
+            return False
+
         # determine if this is a relationship path or an attribute
         try:
             field, related = field.split(self.ordering_delimiter, 1)
@@ -139,32 +230,255 @@ class FieldLookupFilter(backends.DjangoFilterBackend):
 
     ie,
         /api/books?filter[author__id__lte]=5
+
+    Lookups may also be relationship paths, which are filtered by the related view.
+    The related queryset is filtered by the remainder of the path, and applied as a
+    `pk__in` subquery. Relationship filters respect the related view's queryset and
+    its filter class.
+
+    ie,
+        /api/books?filter[author.name]=Tolkien
+
+    Lookups across to-many relationships are applied as a `pk__in` subquery, so that
+    the joined rows do not produce duplicate results.
+
+    The filters also provide facets, which are the counts of the results for each
+    value of a filter field. Each facet is computed with one GROUP BY query, over the
+    results filtered by all of the other filters. The number of values is limited by
+    the param value, or `facet_limit`.
+
+    ie,
+        /api/books?filter[author]=1&facet[author]&facet[series]=10
     """
     filter_regex = re.compile(r'^filter\[(?P<lookup>.+)\]$')
+    filter_delimiter = api_settings.PATH_DELIMITER
+
+    facet_regex = re.compile(r'^facet\[(?P<field>.+)\]$')
+    facet_limit = 100
 
     def filter_queryset(self, request, queryset, view):
-        filter_class = self.get_filter_class(view, queryset)
-        filter_regex = self.filter_regex
+        filters = self.get_filters(request, view)
+        if filters and not getattr(view, 'excluded_facet', None):
+            telemetry.record_shape(view, 'filter', sorted(filters))
 
-        filters = {filter_regex.match(p): v for p, v in list(request.query_params.items())}
-        filters = {p.group('lookup'): v for p, v in list(filters.items()) if p is not None}
+        return self.filter_lookups(view, queryset, filters)
+
+    def filter_lookups(self, view, queryset, filters, prefix=''):
+        """
+        Filters the queryset by the lookups for a view. `prefix` is the relationship
+        path of the view, relative to the primary view.
+        """
+        lookups, related = self.group_filters(filters)
+        filter_class = self.get_filter_subset(view, queryset, lookups)
 
         if filter_class:
-            if hasattr(filter_class, 'get_subset'):
-                filter_class = filter_class.get_subset(filters)
+            model = queryset.model
+            to_many = any(
+                is_to_many_lookup(model, self.get_lookup_path(filter_class, lookup))
+                for lookup in lookups
+            )
+
+            # filter to-many lookups in a subquery, which is not joined to the queryset
+            filtered = model._default_manager.all() if to_many else queryset
 
             try:
-                return filter_class(filters, queryset=queryset).qs
+                filtered = filter_class(lookups, queryset=filtered).qs
             except ValidationError as e:
-                raise self._convert_exception(e)
+                raise self._convert_exception(e, prefix)
+
+            queryset = queryset.filter(pk__in=filtered.values('pk')) if to_many else filtered
+
+        for relname, subfilters in list(related.items()):
+            lookup = self.get_related_filter(view, queryset.model, relname, subfilters, prefix)
+            queryset = queryset.filter(**lookup)
 
         return queryset
 
-    def _convert_exception(self, exc):
+    def get_lookup_path(self, filter_class, lookup):
+        """
+        Returns the model lookup of a filter param (eg, `tags__text__icontains`
+        for a `tag_text` filter declared with `name='tags__text'`).
+        """
+        lookup_filter = getattr(filter_class, 'base_filters', {}).get(lookup)
+        if lookup_filter is None or not lookup_filter.name:
+            return lookup
+
+        lookup_expr = get_lookup_expr(lookup_filter)
+        if isinstance(lookup_expr, six.string_types):
+            return LOOKUP_SEP.join([lookup_filter.name, lookup_expr])
+        return lookup_filter.name
+
+    def group_filters(self, filters):
+        """
+        Splits the filters into a tuple of ({lookup: value}, {relname: {subpath: value}}).
+        """
+        lookups, related = {}, {}
+
+        for lookup, value in list(filters.items()):
+            try:
+                relname, subpath = lookup.split(self.filter_delimiter, 1)
+            except ValueError:
+                lookups[lookup] = value
+            else:
+                related.setdefault(relname, {})[subpath] = value
+
+        return lookups, related
+
+    def get_related_filter(self, view, model, relname, filters, prefix=''):
+        """
+        Returns the `{attname__in: subquery}` filter for a relationship, where
+        the subquery selects the pks of the filtered related queryset. To-many
+        relationships are filtered by a `pk__in` subquery instead, which selects
+        the pks of the related model instances.
+        """
+        try:
+            rel = view.get_relationship(relname)
+        except NotFound:
+            raise ErrorList(errors=[
+                FilterValidationError(
+                    '`%s` is not a valid relationship.' % (prefix + relname),
+                    'filter[%s%s%s]' % (prefix + relname, self.filter_delimiter, lookup),
+                ) for lookup in sorted(filters)
+            ])
+
+        queryset = view.get_related_queryset(rel)
+        queryset = queryset.select_related(None).prefetch_related(None)
+
+        prefix = prefix + relname + self.filter_delimiter
+        queryset = self.filter_lookups(rel.viewset, queryset, filters, prefix)
+
+        lookup = {'%s__in' % rel.attname: queryset.values('pk')}
+        if rel.info.to_many:
+            return {'pk__in': model._default_manager.filter(**lookup).values('pk')}
+        return lookup
+
+    def get_filters(self, request, view=None):
+        """
+        Returns a dict of {lookup: value} for the request's filter params. The
+        view's batch param (eg, `filter[id]`) and sync param (eg,
+        `filter[updated_since]`) are handled by the view. The filters of the
+        view's `excluded_facet` are omitted while its counts are computed.
+        """
+        filter_regex = self.filter_regex
+        excluded = [getattr(view, 'batch_param', None)]
+        if getattr(view, 'sync_field', None):
+            excluded.append(view.sync_param)
+
+        filters = {
+            filter_regex.match(p): v for p, v in list(request.query_params.items())
+            if p not in excluded
+        }
+        filters = {p.group('lookup'): v for p, v in list(filters.items()) if p is not None}
+
+        facet = getattr(view, 'excluded_facet', None)
+        if facet:
+            filters = {
+                lookup: value for lookup, value in list(filters.items())
+                if not is_facet_lookup(lookup, facet)
+            }
+        return filters
+
+    def get_filter_subset(self, view, queryset, filters):
+        """
+        Returns the filter class, reduced to the subset of filters necessary
+        for the requested lookups. The subset class is cached per set of lookups.
+        """
+        def build():
+            filter_class = self.get_filter_class(view, queryset)
+
+            if filter_class and hasattr(filter_class, 'get_subset'):
+                filter_class = filter_class.get_subset(filters)
+            return filter_class
+
+        key = ('filter', frozenset(filters))
+        return plans.get_plan(view, key, build)
+
+    def get_requested_facets(self, request):
+        """
+        Returns a map of {filter name: limit} for the request's facet params.
+        """
+        facets = OrderedDict()
+
+        for param, value in sorted(request.query_params.items()):
+            match = self.facet_regex.match(param)
+            if match is None:
+                continue
+
+            try:
+                limit = int(value) if value else self.facet_limit
+            except ValueError:
+                limit = 0
+
+            if limit <= 0:
+                raise ParseError(
+                    detail='`%s` is not a valid facet limit.' % value,
+                    source={'parameter': param},
+                )
+
+            facets[match.group('field')] = limit
+
+        return facets
+
+    def get_facets(self, request, view):
+        """
+        Returns a map of {filter name: [{value, count}]} for the requested facets,
+        or `None` if facets were not requested. Facets must be filters of the view's
+        filter class.
+        """
+        requested = self.get_requested_facets(request)
+        if not requested:
+            return None
+
+        filter_class = self.get_filter_class(view, view.get_queryset())
+        base_filters = getattr(filter_class, 'base_filters', {})
+
+        invalid = [name for name in requested if name not in base_filters]
+        if invalid:
+            raise ErrorList(errors=[
+                ParseError(
+                    detail='`%s` is not a valid facet.' % name,
+                    source={'parameter': 'facet[%s]' % name},
+                ) for name in invalid
+            ])
+
+        facets = OrderedDict()
+        for name, limit in list(requested.items()):
+            queryset = self.get_facet_queryset(request, view, name)
+            facets[name] = self.get_facet_counts(queryset, base_filters[name].name, limit)
+
+        return facets
+
+    def get_facet_queryset(self, request, view, name):
+        """
+        Returns the view's queryset filtered by `view.filter_queryset()`, excluding
+        the filters of the facet (eg, `filter[author]`, `filter[author__in]` and
+        `filter[author.name]` are excluded from the 'author' facet). Other filtering
+        of the view (eg, the staged lookups of a query) is applied to the facet.
+        """
+        view.excluded_facet = name
+        try:
+            return view.filter_queryset(view.get_queryset())
+        finally:
+            view.excluded_facet = None
+
+    def get_facet_counts(self, queryset, field, limit):
+        """
+        Returns the [{value, count}] of the most common values of the field.
+        """
+        counts = queryset.order_by().values(field) \
+            .annotate(_facet_count=Count('pk', distinct=True)) \
+            .order_by('-_facet_count', field)[:limit]
+
+        return [
+            OrderedDict((('value', row[field]), ('count', row['_facet_count'])))
+            for row in counts
+        ]
+
+    def _convert_exception(self, exc, prefix=''):
         errors = []
 
         for param, exc_list in list(exc.message_dict.items()):
-            parameter = 'filter[%s]' % param
+            parameter = 'filter[%s%s]' % (prefix, param)
             errors += [FilterValidationError(detail, parameter) for detail in exc_list]
 
         return ErrorList(errors)
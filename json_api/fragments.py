@@ -0,0 +1,298 @@
+'''
+The fragment cache stores the encoded resource objects of a viewset in Django's
+cache framework, so that read-mostly resources are not rebuilt for each request.
+Fragments are keyed by the (viewset, type, id, version, request variant), where
+the variant describes the request's effect on the resource object (ie, the API
+root and link mode of its links).
+
+ex::
+
+    class AuthorViewSet(viewsets.ResourceViewSet):
+        ...
+        fragment_cache_class = fragments.ResourceFragmentCache
+
+Fragments are invalidated by versioning, as cache keys cannot be deleted by
+pattern. Each instance has a version, which is replaced through the model's
+`post_save`, `post_delete` and `m2m_changed` signals. Resource objects
+also depend on related models through the serializer field sources (eg,
+`source='series.title'`) and counted relationships (see `rel`). These related
+models invalidate all fragments of the viewset when a related instance is
+saved or deleted.
+
+The signals are connected on first use. Viewsets should be registered on
+startup (eg, in `AppConfig.ready()`), so that changes made by other processes
+before the first request are not missed:
+
+    fragments.register(AuthorViewSet)
+
+The versions and fragments of a list of resources are fetched with one cache
+query each (see `prefetch_resource_fragments()`).
+
+The hits and misses of each viewset's cache are counted, and are available
+with `get_stats()`.
+'''
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from json_api.renderers import ResourceFragment
+from json_api.utils import view_meta
+
+
+class ResourceFragmentCache(object):
+    """
+    Stores the resource fragments of a viewset in a Django cache.
+    """
+    cache_alias = 'default'
+    key_prefix = 'json_api.fragment'
+
+    # Fragments expire after `timeout` seconds. Versions do not expire, but
+    # may be evicted, in which case a new version is created.
+    timeout = 300
+    version_timeout = None
+
+    def __init__(self, view_class):
+        view = view_class()
+
+        self.view_path = '%s.%s' % (view_class.__module__, view_class.__name__)
+        self.model = view.get_queryset().model
+        self.relationships = list(view.relationships or [])
+        self.related_paths = view.get_related_paths()
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def get_key(self, *parts):
+        digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+        return '%s:%s' % (self.key_prefix, digest)
+
+    def get_model_key(self):
+        return self.get_key('model', self.view_path)
+
+    def get_instance_key(self, pk):
+        return self.get_key('instance', self.view_path, pk)
+
+    def get_version(self, instance):
+        """
+        Returns the version of the instance's fragments, which is a combination
+        of the viewset's version and the instance's version.
+        """
+        return self.get_versions([instance])[instance.pk]
+
+    def get_versions(self, instances):
+        """
+        Returns a map of {pk: version} for the instances, which are fetched
+        with a single cache query.
+        """
+        model_key = self.get_model_key()
+        instance_keys = OrderedDict(
+            (instance.pk, self.get_instance_key(instance.pk)) for instance in instances
+        )
+
+        keys = [model_key] + list(instance_keys.values())
+        versions = self.cache.get_many(keys)
+
+        for key in keys:
+            if key not in versions:
+                versions[key] = self.create_version(key)
+
+        return {
+            pk: '%s.%s' % (versions[model_key], versions[key])
+            for pk, key in list(instance_keys.items())
+        }
+
+    def create_version(self, key):
+        version = uuid.uuid4().hex
+
+        # another request may have created the version concurrently
+        if not self.cache.add(key, version, self.version_timeout):
+            version = self.cache.get(key) or version
+        return version
+
+    def invalidate(self, pks=None):
+        """
+        Replaces the versions of the instances, or of the viewset if `pks` is
+        `None`, so that their fragments are no longer used.
+        """
+        if pks is None:
+            keys = [self.get_model_key()]
+        else:
+            keys = [self.get_instance_key(pk) for pk in pks]
+
+        self.cache.set_many({key: uuid.uuid4().hex for key in keys}, self.version_timeout)
+
+    def get_fragment_key(self, resource_type, resource_id, version, variant):
+        return self.get_key(self.view_path, resource_type, resource_id, version, variant)
+
+    def get(self, resource_type, resource_id, version, variant):
+        resource = (resource_type, resource_id, version)
+        return self.get_many([resource], variant)[resource]
+
+    def get_many(self, resources, variant):
+        """
+        Returns a map of {(type, id, version): fragment} for the resources,
+        which are fetched with a single cache query. The fragment is `None`
+        if it is not cached.
+        """
+        keys = OrderedDict(
+            (resource, self.get_fragment_key(*(resource + (variant, ))))
+            for resource in resources
+        )
+        cached = self.cache.get_many(list(keys.values()))
+
+        fragments = {}
+        for resource, key in list(keys.items()):
+            fragment = cached.get(key)
+            record(self.view_path, fragment is not None)
+            fragments[resource] = ResourceFragment(*fragment) if fragment is not None else None
+
+        return fragments
+
+    def set(self, fragment, version, variant):
+        key = self.get_fragment_key(fragment.type, fragment.id, version, variant)
+        self.cache.set(key, (fragment.id, fragment.type, fragment.content), self.timeout)
+
+    def get_through_models(self):
+        """
+        Returns the through models of the many-to-many relations of the model.
+        """
+        opts = self.model._meta
+
+        # `rel` is renamed to `remote_field` in Django 1.9
+        through_models = [
+            (getattr(field, 'remote_field', None) or field.rel).through
+            for field in opts.many_to_many
+        ]
+        through_models += [
+            relation.through for relation in opts.related_objects
+            if relation.many_to_many
+        ]
+        return through_models
+
+    def get_counted_models(self):
+        """
+        Returns the related models of counted relationships, whose changes affect
+        the relationship meta. Many-to-many relationships are excluded, as they are
+        handled by the `m2m_changed` signal.
+        """
+        models = []
+        for rel in self.relationships:
+            field = self.model._meta.get_field(rel.attname)
+
+            if getattr(rel, 'count', False) and field.one_to_many:
+                models.append(field.related_model)
+        return models
+
+    def get_source_fields(self):
+        """
+        Returns the relation fields along the serializer field sources, whose
+        related models affect the resource attributes (eg, `source='series.title'`).
+        """
+        select_related, prefetch_related = self.related_paths
+
+        fields = []
+        for path in select_related + prefetch_related:
+            for field in view_meta.get_path_fields(self.model, path):
+                if field not in fields:
+                    fields.append(field)
+        return fields
+
+    def connect(self):
+        """
+        Connects the signals that invalidate the fragments.
+        """
+        def instance_changed(sender, instance, **kwargs):
+            self.invalidate([instance.pk])
+
+        def related_changed(sender, instance, **kwargs):
+            self.invalidate()
+
+        def m2m_relation_changed(sender, instance, action, model, pk_set, **kwargs):
+            if not action.startswith('post_'):
+                return
+
+            if isinstance(instance, self.model):
+                self.invalidate([instance.pk])
+
+            # the related instances are unknown when the relation is cleared,
+            # in which case all fragments are invalidated.
+            if issubclass(model, self.model):
+                self.invalidate(pk_set)
+
+        uid = 'json_api.fragments.%s' % self.view_path
+        post_save.connect(instance_changed, sender=self.model, weak=False, dispatch_uid=uid)
+        post_delete.connect(instance_changed, sender=self.model, weak=False, dispatch_uid=uid)
+
+        for through in self.get_through_models():
+            m2m_changed.connect(m2m_relation_changed, sender=through, weak=False, dispatch_uid=uid)
+
+        for model in self.get_counted_models():
+            post_save.connect(related_changed, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(related_changed, sender=model, weak=False, dispatch_uid=uid)
+
+        # the sources may traverse the model itself (eg, `source='parent.name'`),
+        # which is connected separately from the instance signals.
+        source_uid = '%s.sources' % uid
+        through_models = self.get_through_models()
+        for field in self.get_source_fields():
+            model = field.related_model
+            post_save.connect(related_changed, sender=model, weak=False, dispatch_uid=source_uid)
+            post_delete.connect(related_changed, sender=model, weak=False, dispatch_uid=source_uid)
+
+            if not field.many_to_many:
+                continue
+
+            # the model's own many-to-many relations are handled above
+            through = getattr(field, 'through', None) or \
+                (getattr(field, 'remote_field', None) or field.rel).through
+            if through not in through_models:
+                m2m_changed.connect(
+                    related_changed, sender=through, weak=False, dispatch_uid=source_uid,
+                )
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def register(view_class):
+    """
+    Returns the fragment cache for the view class, connecting the signals
+    that invalidate its fragments on first registration.
+    """
+    with _caches_lock:
+        fragment_cache = _caches.get(view_class)
+        if fragment_cache is not None:
+            return fragment_cache
+
+        fragment_cache = _caches[view_class] = view_class.fragment_cache_class(view_class)
+
+    fragment_cache.connect()
+    return fragment_cache
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record(view_path, hit):
+    with _stats_lock:
+        stats = _stats.setdefault(view_path, {'hits': 0, 'misses': 0})
+        stats['hits' if hit else 'misses'] += 1
+
+
+def get_stats():
+    """
+    Returns a map of {viewset path: {'hits': int, 'misses': int}} for the
+    fragment caches of this process.
+    """
+    with _stats_lock:
+        return {path: dict(stats) for path, stats in list(_stats.items())}
+
+
+def reset_stats():
+    with _stats_lock:
+        _stats.clear()
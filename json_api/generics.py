@@ -1,20 +1,34 @@
 
 from collections import OrderedDict
 from django.db.models.query import QuerySet
-from django.db.models import Value, CharField
+from django.db.models import Count, Value, CharField
 from django.utils.functional import cached_property
 from rest_framework.generics import GenericAPIView
 
-from json_api.utils import model_meta
+from json_api.utils import model_meta, view_meta
 from json_api.utils.reverse import reverse
 from json_api.utils.urls import unquote_brackets
 from json_api.exceptions import PermissionDenied
 from json_api.settings import api_settings
-from json_api import serializers, views
+from json_api import fragments, serializers, telemetry, views
+
+
+# cache of {serializer class: (select_related, prefetch_related)} paths
+_related_paths_cache = {}
 
 
 class GenericResourceView(views.ResourceView, GenericAPIView):
     inclusion_class = api_settings.DEFAULT_INCLUSION_CLASS
+    aggregation_class = api_settings.DEFAULT_AGGREGATION_CLASS
+    assembler_class = None
+
+    # Set to a `ResourceFragmentCache` class to cache the encoded resource objects.
+    fragment_cache_class = None
+
+    # Set to `False` to disable the automatic `select_related` and
+    # `prefetch_related` optimization of the view's queryset.
+    optimize_queryset = True
+    optimized_actions = ('list', 'retrieve', 'export', 'query')
 
     @cached_property
     def model_info(self):
@@ -39,6 +53,51 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
         except (model.DoesNotExist, model.MultipleObjectsReturned, ValueError):
             return None
 
+    def finalize_response(self, request, response, *args, **kwargs):
+        # record the filter and sort usage, if telemetry is enabled.
+        telemetry.record_view(self)
+
+        return super(GenericResourceView, self).finalize_response(request, response, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super(GenericResourceView, self).get_queryset()
+
+        # views that are not viewsets (or related viewsets used to build
+        # included data) do not have an action.
+        action = getattr(self, 'action', None)
+        if self.optimize_queryset and action in self.optimized_actions + (None, ):
+            queryset = self.apply_related_paths(queryset)
+
+        return queryset
+
+    def get_related_paths(self):
+        """
+        Returns a tuple of (select_related, prefetch_related) paths that are
+        derived from the view's serializer field sources. The paths are
+        computed once per serializer class.
+        """
+        serializer_class = self.serializer_class
+        if serializer_class is None:
+            return [], []
+
+        if serializer_class not in _related_paths_cache:
+            _related_paths_cache[serializer_class] = view_meta.get_related_paths(self)
+        return _related_paths_cache[serializer_class]
+
+    def apply_related_paths(self, queryset):
+        """
+        Applies the `select_related` and `prefetch_related` paths to the
+        queryset, avoiding a query per instance when rendering attributes.
+        """
+        select_related, prefetch_related = self.get_related_paths()
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+
+        return queryset
+
     def get_relationships(self):
         """
         Returns the relationship names associated with this view, mapped to
@@ -122,7 +181,26 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
 
         links = {name: unquote_brackets(link) for name, link in list(links.items())}
 
-        return links
+        # top-level links are necessary for pagination, and are not omitted.
+        return self.format_links(links, relative=self.get_link_mode() != 'absolute')
+
+    def get_default_meta(self):
+        """
+        The default top-level meta for the current request. Contains the
+        pagination meta (eg, the count), the aggregates and the facets if applicable.
+        """
+        meta = OrderedDict()
+
+        if getattr(self, 'page', None) is not None and hasattr(self.paginator, 'get_meta'):
+            meta.update(self.paginator.get_meta() or {})
+
+        if getattr(self, 'aggregates', None) is not None:
+            meta['aggregates'] = self.aggregates
+
+        if getattr(self, 'facets', None) is not None:
+            meta['facets'] = self.facets
+
+        return meta or None
 
     def get_primary_type(self):
         model = self.get_queryset().model
@@ -143,6 +221,71 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
         """
         return model_meta.verbose_name(instance)
 
+    def get_fragment_cache(self):
+        """
+        Returns the fragment cache for the view class, or `None`.
+        """
+        if self.fragment_cache_class is None:
+            return None
+        return fragments.register(self.__class__)
+
+    def get_resource_variant(self):
+        """
+        Returns the parts of the request that affect the content of a resource
+        object, which are part of the fragment cache key.
+        """
+        return (self.get_api_root(), self.get_link_mode())
+
+    def prefetch_resource_fragments(self, instances):
+        """
+        Fetches the versions and fragments of the instances with one cache
+        query each. Instances of subtypes are built by their own views.
+        """
+        fragment_cache = self.get_fragment_cache()
+        if fragment_cache is None:
+            return
+
+        subtypes = self.get_subtypes()
+        instances = [
+            instance for instance in instances
+            if self.get_resource_type(instance) not in subtypes
+        ]
+        if not instances:
+            return
+
+        versions = fragment_cache.get_versions(instances)
+        resources = [(
+            self.get_resource_type(instance),
+            self.get_resource_id(instance),
+            versions[instance.pk],
+        ) for instance in instances]
+
+        self._prefetched_versions = versions
+        self._prefetched_fragments = fragment_cache.get_many(resources, self.get_resource_variant())
+
+    def get_resource_version(self, instance):
+        fragment_cache = self.get_fragment_cache()
+        if fragment_cache is None:
+            return None
+
+        versions = getattr(self, '_prefetched_versions', {})
+        if instance.pk in versions:
+            return versions[instance.pk]
+        return fragment_cache.get_version(instance)
+
+    def get_resource_fragment(self, resource_type, resource_id, version):
+        fragments = getattr(self, '_prefetched_fragments', {})
+        resource = (resource_type, resource_id, version)
+        if resource in fragments:
+            return fragments[resource]
+
+        fragment_cache = self.get_fragment_cache()
+        return fragment_cache.get(resource_type, resource_id, version, self.get_resource_variant())
+
+    def set_resource_fragment(self, fragment, version):
+        fragment_cache = self.get_fragment_cache()
+        fragment_cache.set(fragment, version, self.get_resource_variant())
+
     def get_resource_attributes(self, instance):
         return self.get_serializer(instance).data
 
@@ -153,6 +296,9 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
 
         Additionally, it includes any detail routes attached to the viewset.
         """
+        if self.get_link_mode() == 'none':
+            return None
+
         view_name = "%s-detail" % self.get_basename()
         resource_id = self.get_resource_id(instance)
         links = OrderedDict((
@@ -164,10 +310,13 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
         # TODO: maybe move to HTML renderer?
         links = {name: unquote_brackets(link) for name, link in list(links.items())}
 
-        return links
+        return self.format_links(links)
 
     def get_relationship_links(self, rel, instance):
-        return OrderedDict((
+        if self.get_link_mode() == 'none':
+            return None
+
+        links = OrderedDict((
             ('self', reverse(
                 '%s-relationship' % self.get_basename(),
                 self.request,
@@ -180,8 +329,13 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
             )),
         ))
 
-    def get_relationship_linkage(self, rel, instance):
-        # don't forget to paginate the queryset
+        return self.format_links(links)
+
+    def get_relationship_linkage(self, rel, instance, paginate=False):
+        """
+        Returns the resource linkage for a relationship. Set `paginate` to
+        paginate the linkage of to-many relationships with the view's paginator.
+        """
         related = self.get_related_data(rel, instance)
 
         if related is None:
@@ -194,18 +348,76 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
                 ('type', self.get_resource_type(related)),
             ))
 
-        resource_type = self.get_resource_type(related.model)
         serializer_class = rel.viewset.get_identity_serializer()
-        related = related.only('pk').annotate(type=Value(resource_type, CharField()))
+        related = self.get_linkage_queryset(related)
+
+        if paginate:
+            self.page = self.paginate_queryset(related)
+            if self.page is not None:
+                related = self.page
 
         # TODO: build object individually, similar to build_resource. This is
         # related to additional view handling, such as meta blocks.
         return serializer_class(related, many=True).data
 
-    def get_relationship_meta(self, rel):
-        pass
+    def get_linkage_queryset(self, queryset):
+        """
+        Returns the queryset of related instances, limited to what is
+        necessary for building their resource identifiers.
+        """
+        resource_type = self.get_resource_type(queryset.model)
+
+        # clear any queryset optimizations, as only the pk is needed.
+        queryset = queryset.select_related(None).prefetch_related(None)
+        return queryset.only('pk').annotate(type=Value(resource_type, CharField()))
+
+    def get_counted_relationships(self):
+        """
+        Returns the to-many relationships whose counts are included in the
+        relationship meta (ie, `rel(..., count=True)`).
+        """
+        return [
+            rel for rel in list(self.get_relationships().values())
+            if getattr(rel, 'count', False) and rel.info.to_many
+        ]
+
+    def get_relationship_count_annotation(self, rel):
+        return '_%s_count' % rel.relname
 
-    def build_relationship_object(self, rel, instance, include_linkage=False):
+    def annotate_relationship_counts(self, queryset):
+        """
+        Annotates the counts of the counted relationships, so that the counts of
+        a page of resources are fetched along with the page.
+        """
+        annotations = {
+            self.get_relationship_count_annotation(rel): Count(rel.attname, distinct=True)
+            for rel in self.get_counted_relationships()
+        }
+
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+    def get_relationship_meta(self, rel, instance=None):
+        """
+        Returns the meta of a relationship object. Contains the number of related
+        objects for counted relationships. The count is read from the annotation,
+        or is queried if the instance was not annotated (eg, for a retrieve).
+
+        Note:
+        The count includes all related objects, and is not limited to those in
+        the related view's queryset.
+        """
+        if instance is None or not (getattr(rel, 'count', False) and rel.info.to_many):
+            return None
+
+        count = getattr(instance, self.get_relationship_count_annotation(rel), None)
+        if count is None:
+            count = getattr(instance, self.get_related_accessor_name(rel, instance)).count()
+
+        return OrderedDict((('count', count), ))
+
+    def build_relationship_object(self, rel, instance, include_linkage=False, paginate=False):
         """
         Builds a relationship object that represents to-one and to-many
         relationships between the primary resource and related resources.
@@ -215,24 +427,38 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
         Set `include_linkage` to include relationship linkage data in the
         request.
 
+        Set `paginate` to paginate to-many linkage with the view's paginator.
+        The pagination links are added to the relationship object's links.
+
         Note:
-        Paginated data is only supported for the primary request resource.
-        Because of this, linkage for to-many relationships should NOT be
-        included outside of a specific relationship request.
+        Paginated data is only supported for the primary request resource, or
+        the relationship of a relationship request (see `paginate`). Because
+        of this, linkage for to-many relationships should NOT be included
+        outside of a specific relationship request.
 
         ie, do not include linkage for /api/books/1. Do include linkage
         for /api/books/1/authors.
 
         """
-        rel_object = OrderedDict((
-            ('links', self.get_relationship_links(rel, instance)),
-        ))
+        rel_object = OrderedDict()
+
+        links = self.get_relationship_links(rel, instance)
+        if links is not None:
+            rel_object['links'] = links
 
         if include_linkage:
-            data = self.get_relationship_linkage(rel, instance)
+            data = self.get_relationship_linkage(rel, instance, paginate)
             rel_object['data'] = data
 
-        meta = self.get_relationship_meta(rel)
+            if paginate and getattr(self, 'page', None):
+                links = self.paginator.get_links()
+                links = {name: unquote_brackets(link) for name, link in list(links.items())}
+
+                # pagination links are necessary, and are not omitted.
+                links = self.format_links(links, relative=self.get_link_mode() != 'absolute')
+                rel_object.setdefault('links', OrderedDict()).update(links)
+
+        meta = self.get_relationship_meta(rel, instance)
         if meta:
             rel_object['meta'] = meta
 
@@ -269,13 +495,16 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
         if linkages is None:
             linkages = []
 
-        return OrderedDict([(
+        relationships = OrderedDict([(
             rel.relname,
             self.build_relationship_object(
                 rel, instance, relname in linkages
             )
         ) for relname, rel in list(self.get_relationships().items())])
 
+        # relationship objects may be empty if links are omitted.
+        return OrderedDict((k, v) for k, v in list(relationships.items()) if v)
+
     def get_related_queryset(self, rel):
         """
         Returns the queryset for the relationship descriptor.
@@ -402,6 +631,71 @@ class GenericResourceView(views.ResourceView, GenericAPIView):
             return None
         return self.includer.group_include_paths(paths)
 
+    @property
+    def aggregator(self):
+        """
+        The aggregation instance associated with the view, or `None`.
+        """
+        if not hasattr(self, '_aggregator'):
+            if self.aggregation_class is None:
+                self._aggregator = None
+            else:
+                self._aggregator = self.aggregation_class()
+        return self._aggregator
+
+    def get_aggregates(self, queryset):
+        """
+        Returns the requested aggregates of the queryset, or `None`.
+        """
+        if self.aggregator is None:
+            return None
+        return self.aggregator.get_aggregates(queryset, self.request, view=self)
+
+    def get_facets(self):
+        """
+        Returns the requested facets of the view's filter backends, or `None`.
+        """
+        for backend in list(self.filter_backends):
+            if hasattr(backend, 'get_facets'):
+                return backend().get_facets(self.request, self)
+        return None
+
+    def is_aggregate_only(self):
+        """
+        Determines if the primary data should be omitted from the response.
+        """
+        if self.aggregator is None:
+            return False
+        return self.aggregator.is_aggregate_only(self.request, view=self)
+
+    @property
+    def assembler(self):
+        """
+        The resource assembler instance associated with the view, or `None`.
+        """
+        if not hasattr(self, '_assembler'):
+            if self.assembler_class is None:
+                self._assembler = None
+            else:
+                self._assembler = self.assembler_class()
+        return self._assembler
+
+    def get_assembled_queryset(self, queryset, include_paths=None):
+        """
+        Returns a queryset of rows containing resource objects that are built
+        by the database, or `None` if assembly is not supported.
+        """
+        # Related resources are included from model instances.
+        if self.assembler is None or include_paths:
+            return None
+        return self.assembler.get_assembled_queryset(queryset, self)
+
+    def get_assembled_resources(self, rows):
+        """
+        Returns the resource fragments for the assembled rows.
+        """
+        return self.assembler.get_resources(rows, self)
+
     def link_related(self, rel, instance, related):
         if not rel.info.to_many:
             raise Exception('raise configuration error: to-one should not call link_related')
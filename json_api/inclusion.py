@@ -4,7 +4,7 @@ from django.utils import six
 from django.utils.functional import LazyObject
 from json_api.exceptions import ErrorList, NotFound, ParseError
 from json_api.settings import api_settings
-from json_api.utils import view_meta
+from json_api.utils import plans, view_meta
 
 # TODO: could probably use a rewrite, but is a good first pass.
 
@@ -95,10 +95,14 @@ class RelatedResourceInclusion(BaseInclusion):
         """
         params = request.query_params.get(self.include_param)
         if params:
-            paths = [param.strip() for param in params.split(',')]
+            paths = tuple(param.strip() for param in params.split(','))
 
-            self.check_include_paths(queryset, paths, view)
-            return paths
+            def build():
+                self.check_include_paths(queryset, paths, view)
+                return list(paths)
+
+            # validated paths are cached per set of include paths
+            return list(plans.get_plan(view, (self.include_param, paths), build))
 
         # No paths were included, use defaults
         return self.get_default_include_paths(view)
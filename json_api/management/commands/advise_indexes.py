@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from json_api import telemetry
+from json_api.settings import api_settings
+
+
+class Command(BaseCommand):
+    help = "Proposes the model indexes that are missing for the recorded filter and sort usage."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--file', default=api_settings.USAGE_TELEMETRY_FILE,
+            help="The usage telemetry file. Defaults to the 'USAGE_TELEMETRY_FILE' setting.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not path:
+            raise CommandError("A usage telemetry file is required.")
+
+        proposals = telemetry.get_index_proposals(telemetry.UsageAggregator.load(path))
+        if not proposals:
+            self.stdout.write("No missing indexes were found.")
+            return
+
+        for model, names, count, total in proposals:
+            label = '%s.%s' % (model._meta.app_label, model._meta.object_name)
+
+            if len(names) == 1:
+                suggestion = "%s.%s: db_index=True" % (label, names[0])
+            else:
+                fields = ', '.join("'%s'" % name for name in names)
+                suggestion = "%s: index_together = [(%s)]" % (label, fields)
+
+            self.stdout.write("%s  (%d requests, %.3fs)" % (suggestion, count, total))
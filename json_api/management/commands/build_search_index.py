@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from json_api import search
+from json_api.utils import import_class
+
+
+class Command(BaseCommand):
+    help = "Builds the full text search index for the given viewsets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'viewsets', nargs='+', metavar='viewset',
+            help="Dotted path to a searchable viewset class.",
+        )
+        parser.add_argument(
+            '--database', default=DEFAULT_DB_ALIAS,
+            help="The database to build the index in. Defaults to the 'default' database.",
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+
+        for path in options['viewsets']:
+            try:
+                view_class = import_class(path)
+            except (ImportError, AttributeError) as exc:
+                raise CommandError("Unable to import '%s': %s" % (path, exc))
+
+            index = search.register(view_class)
+            if not index.is_supported(using):
+                raise CommandError("The '%s' database does not support full text search." % using)
+
+            count = index.rebuild(using)
+            self.stdout.write("Indexed %d rows in '%s'." % (count, index.table))
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=255)),
+                ('deleted', models.DateTimeField()),
+                ('scope', models.CharField(max_length=255, blank=True, default='')),
+            ],
+        ),
+        migrations.AlterIndexTogether(
+            name='tombstone',
+            index_together=set([('model', 'deleted')]),
+        ),
+    ]
@@ -3,13 +3,16 @@ from .base import (
     CreateResourceMixin, ListResourceMixin, RetrieveResourceMixin,
     UpdateResourceMixin, DestroyResourceMixin,
 )
+from .export import ExportResourceMixin
+from .query import QueryResourceMixin
 from .relationships import RetrieveRelationshipMixin, ManageRelationshipMixin
 from .related import RetrieveRelatedResourceMixin, ManageRelatedResourceMixin
 
 
 __all__ = (
     'CreateResourceMixin', 'ListResourceMixin', 'RetrieveResourceMixin',
-    'UpdateResourceMixin', 'DestroyResourceMixin',
+    'UpdateResourceMixin', 'DestroyResourceMixin', 'ExportResourceMixin',
+    'QueryResourceMixin',
     'RetrieveRelationshipMixin', 'ManageRelationshipMixin',
     'RetrieveRelatedResourceMixin', 'ManageRelatedResourceMixin',
 )
@@ -1,8 +1,23 @@
 
+from collections import OrderedDict
+from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.response import Response
-from json_api import exceptions
+from json_api.renderers import APIRenderer, ResourceFragment
+from json_api.utils import processes
+from json_api import exceptions, sync
+
+try:
+    from django.db.models import prefetch_related_objects
+except ImportError:
+    # Django < 1.10 accepts the lookups as a list
+    from django.db.models.query import prefetch_related_objects as _prefetch_related_objects
+
+    def prefetch_related_objects(instances, *lookups):
+        _prefetch_related_objects(instances, list(lookups))
 
 
 class CreateResourceMixin(object):
@@ -79,21 +94,79 @@ class CreateResourceMixin(object):
 class ListResourceMixin(object):
     """
     List a queryset of resources.
+
+    Set `streaming` to render the collection through a streaming response,
+    provided that the accepted renderer supports streaming.
+
+    Set `render_processes` to build and encode the resource objects of large
+    pages in a pool of worker processes. Pages are split into chunks of
+    `render_chunk_size` instances, whose field values are sent to the workers.
+    The pool is created on first use, and is shared by the requests of the
+    process. Instances are rebuilt from their field values and the relationship
+    counts, so that other annotations of the queryset are not available to the
+    workers (eg, in `build_resource()`).
+
+    Specific resources may be fetched by a comma separated list of ids (eg,
+    `?filter[id]=1,2,3`). The resources are returned in the requested order
+    and are not paginated. Ids that are not found are listed in the `meta`.
+
+    Aggregates of the filtered queryset (eg, `?aggregate[pages]=sum`) and the
+    facet counts of the filters (eg, `?facet[author]`) are returned in the
+    `meta`. The primary data is omitted for aggregate only requests (see
+    `json_api.aggregation`).
+
+    Set `sync_field` to the model's modification timestamp to support incremental
+    sync requests (eg, `?filter[updated_since]=<cursor>`), which return the changed
+    resources and the ids of the deleted resources (see `json_api.sync`). The ids
+    of deleted resources are not checked against the queryset, and should be
+    scoped with `get_sync_scope()` and `get_sync_scopes()` for restricted views.
     """
+    streaming = False
+    render_processes = None
+    render_chunk_size = 500
+    stream_chunk_size = 500
+
+    batch_param = 'filter[id]'
+    batch_chunk_size = 500
+    max_batch_size = 1000
+
+    sync_field = None
+    sync_param = 'filter[updated_since]'
+
     def list(self, request, *args, **kwargs):
+        ids = self.get_batch_ids(request)
+        if ids is not None:
+            return self.list_batch(ids)
+
+        if self.sync_field and self.sync_param in request.query_params:
+            return self.list_sync(request)
+
+        if self.is_aggregate_only():
+            return self.list_aggregates()
+
+        if self.streaming and hasattr(request.accepted_renderer, 'render_stream'):
+            return self.stream_list(request, *args, **kwargs)
+
         queryset = self.filter_queryset(self.get_queryset())
+        self.aggregates = self.get_aggregates(queryset)
+        self.facets = self.get_facets()
 
         include_paths = self.get_include_paths(queryset)
         linkages = list(self.group_include_paths(include_paths).keys())
 
+        assembled = self.get_assembled_queryset(queryset, include_paths)
+        if assembled is not None:
+            return self.list_assembled(assembled)
+
+        queryset = self.annotate_relationship_counts(queryset)
         page = self.paginate_queryset(queryset)
         self.page = page
         if page is not None:
-            data = [self.build_resource(instance, linkages) for instance in page]
+            data = self.build_resources(page, linkages)
             included_data = list(self.get_included_data(page, include_paths).values())
 
         else:
-            data = [self.build_resource(instance, linkages) for instance in queryset]
+            data = self.build_resources(queryset, linkages)
             included_data = list(self.get_included_data(queryset, include_paths).values())
 
         links = self.get_default_links()
@@ -107,17 +180,349 @@ class ListResourceMixin(object):
         if included_data:
             body['included'] = list(included_data)
 
+        meta = self.get_default_meta()
+        if meta:
+            body['meta'] = meta
+
+        response_data = self.build_response_body(**body)
+        return Response(response_data)
+
+    def get_batch_ids(self, request):
+        """
+        Returns the list of requested ids, or `None` if this is not a batch request.
+        """
+        param = request.query_params.get(self.batch_param) if self.batch_param else None
+        if param is None:
+            return None
+
+        model = self.get_queryset().model
+        field = model._meta.pk if self.lookup_field == 'pk' else model._meta.get_field(self.lookup_field)
+
+        ids = []
+        for value in param.split(','):
+            try:
+                value = field.to_python(value.strip())
+            except ValidationError:
+                raise exceptions.ParseError(
+                    detail='`%s` is not a valid id.' % value.strip(),
+                    source={'parameter': self.batch_param},
+                )
+
+            if value not in ids:
+                ids.append(value)
+
+        if len(ids) > self.max_batch_size:
+            raise exceptions.ParseError(
+                detail='Up to %d ids may be requested.' % self.max_batch_size,
+                source={'parameter': self.batch_param},
+            )
+
+        return ids
+
+    def get_batch(self, queryset, ids):
+        """
+        Returns a map of {id: instance} for the requested ids. The ids are
+        fetched in chunks of `batch_chunk_size`, staying under the query
+        parameter limit of the database (eg, 999 for SQLite).
+        """
+        found = {}
+
+        for i in range(0, len(ids), self.batch_chunk_size):
+            chunk = ids[i:i + self.batch_chunk_size]
+
+            if self.lookup_field == 'pk':
+                found.update(queryset.in_bulk(chunk))
+            else:
+                instances = queryset.filter(**{'%s__in' % self.lookup_field: chunk})
+                found.update((getattr(instance, self.lookup_field), instance) for instance in instances)
+
+        return found
+
+    def list_batch(self, ids):
+        """
+        List the resources for the requested ids, in the requested order. The
+        batch is fetched with `in_bulk()`, and is neither paginated nor counted.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        include_paths = self.get_include_paths(queryset)
+        linkages = list(self.group_include_paths(include_paths).keys())
+
+        found = self.get_batch(queryset, ids)
+        instances = [found[pk] for pk in ids if pk in found]
+
+        body = {
+            'links': self.get_default_links(),
+            'data': self.build_resources(instances, linkages),
+        }
+
+        included_data = list(self.get_included_data(instances, include_paths).values())
+        if included_data:
+            body['included'] = included_data
+
+        missing = [pk for pk in ids if pk not in found]
+        if missing:
+            body['meta'] = {'missing': missing}
+
+        response_data = self.build_response_body(**body)
+        return Response(response_data)
+
+    def list_sync(self, request):
+        """
+        List the resources that changed since the sync cursor, ordered by their
+        modification. The resources are not paginated. The ids of the deleted
+        resources and the cursor for the next sync are returned in the `meta`.
+        """
+        since = sync.decode_cursor(request.query_params[self.sync_param], self.sync_param)
+
+        # the next sync starts from before the queries, so that changes made
+        # during the request are not missed.
+        started = timezone.now()
+
+        queryset = self.filter_queryset(self.get_queryset())
+        model = queryset.model
+        sync.register(self.__class__, model)
+
+        if since is not None:
+            queryset = queryset.filter(**{'%s__gte' % self.sync_field: since})
+        queryset = queryset.order_by(self.sync_field, 'pk')
+
+        include_paths = self.get_include_paths(queryset)
+        linkages = list(self.group_include_paths(include_paths).keys())
+
+        body = {
+            'links': self.get_default_links(),
+            'data': self.build_resources(queryset, linkages),
+        }
+
+        included_data = list(self.get_included_data(queryset, include_paths).values())
+        if included_data:
+            body['included'] = included_data
+
+        deleted = []
+        if since is not None:
+            deleted = sync.get_deleted_ids(model, since, self.get_sync_scopes())
+
+        body['meta'] = OrderedDict((
+            ('deleted', deleted),
+            ('cursor', sync.encode_cursor(started)),
+        ))
+
+        response_data = self.build_response_body(**body)
+        return Response(response_data)
+
+    def get_sync_scope(self, instance):
+        """
+        Returns the scope that is recorded in the tombstone of a deleted
+        instance (eg, its owner), or `None`. See `json_api.sync`.
+        """
+        return None
+
+    def get_sync_scopes(self):
+        """
+        Returns the scopes of the tombstones that are visible to the request,
+        or `None` if all of the tombstones of the model are visible.
+        """
+        return None
+
+    def list_aggregates(self):
+        """
+        Returns the aggregates (and facets) of the filtered queryset, without
+        the primary data.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+
+        meta = OrderedDict([('aggregates', self.get_aggregates(queryset) or {})])
+
+        facets = self.get_facets()
+        if facets is not None:
+            meta['facets'] = facets
+
+        response_data = self.build_response_body(
+            links=self.get_default_links(),
+            meta=meta,
+        )
+        return Response(response_data)
+
+    def build_resources(self, instances, linkages=None):
+        """
+        Returns the resource objects for the instances. If `render_processes`
+        is set, large lists are built and encoded by worker processes, and
+        the resource objects are returned as `ResourceFragment`s.
+        """
+        instances = list(instances)
+        chunk_size = self.render_chunk_size
+
+        if not self.render_processes or len(instances) <= chunk_size:
+            # fragments are not used when linkage is requested
+            if not linkages:
+                self.prefetch_resource_fragments(instances)
+            return [self.build_resource(instance, linkages) for instance in instances]
+
+        # the relationship counts are annotated, and would otherwise be queried
+        # for each instance by the workers.
+        annotations = [
+            self.get_relationship_count_annotation(rel)
+            for rel in self.get_counted_relationships()
+        ]
+
+        request_state = processes.get_request_state(self.request)
+        tasks = [(
+            self.__class__, request_state, linkages, [
+                processes.get_instance_state(instance, annotations)
+                for instance in instances[i:i + chunk_size]
+            ],
+        ) for i in range(0, len(instances), chunk_size)]
+
+        pool = processes.get_pool(self.render_processes)
+        chunks = pool.map(_build_resources_worker, tasks)
+
+        return [
+            ResourceFragment(*fragment)
+            for chunk in chunks for fragment in chunk
+        ]
+
+    def list_assembled(self, queryset):
+        """
+        List the resources of an assembled queryset, whose resource objects
+        have been built by the database.
+        """
+        page = self.paginate_queryset(queryset)
+        self.page = page
+
+        rows = page if page is not None else queryset
+        data = self.get_assembled_resources(rows)
+
+        links = self.get_default_links()
+        links.update(self.get_collection_actions())
+
+        body = {
+            'links': links,
+            'data': data,
+        }
+
+        meta = self.get_default_meta()
+        if meta:
+            body['meta'] = meta
+
         response_data = self.build_response_body(**body)
         return Response(response_data)
 
+    def stream_list(self, request, *args, **kwargs):
+        """
+        List a queryset of resources, encoding each resource object as it is
+        built. The instances are read in chunks of `stream_chunk_size`, and the
+        included resources of each chunk are emitted after the primary data.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        self.aggregates = self.get_aggregates(queryset)
+        self.facets = self.get_facets()
+
+        include_paths = self.get_include_paths(queryset)
+        linkages = list(self.group_include_paths(include_paths).keys())
+
+        queryset = self.annotate_relationship_counts(queryset)
+        page = self.paginate_queryset(queryset)
+        self.page = page
+        if page is not None:
+            instance_chunks = self.iter_chunks(page)
+        else:
+            instance_chunks = self.iter_queryset_chunks(queryset)
+
+        links = self.get_default_links()
+        links.update(self.get_collection_actions())
+
+        # included resource objects are collected (and deduplicated) while
+        # the primary data is streamed.
+        included = OrderedDict()
+
+        def data():
+            for chunk in instance_chunks:
+                # fragments are not used when linkage is requested
+                if not linkages:
+                    self.prefetch_resource_fragments(chunk)
+
+                for instance in chunk:
+                    yield self.build_resource(instance, linkages)
+
+                if include_paths:
+                    included.update(self.get_included_data(chunk, include_paths))
+
+        def included_data():
+            for resource in list(included.values()):
+                yield resource
+
+        response_data = self.build_response_body(
+            links=links,
+            data=data(),
+            included=included_data(),
+        )
+
+        meta = self.get_default_meta()
+        if meta:
+            response_data['meta'] = meta
+
+        renderer = request.accepted_renderer
+        renderer_context = self.get_renderer_context()
+        chunks = renderer.render_stream(response_data, request.accepted_media_type, renderer_context)
+
+        return StreamingHttpResponse(chunks, content_type=renderer.media_type)
+
+    def iter_chunks(self, instances):
+        """
+        Yields lists of up to `stream_chunk_size` instances.
+        """
+        chunk = []
+        for instance in instances:
+            chunk.append(instance)
+            if len(chunk) >= self.stream_chunk_size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def iter_queryset_chunks(self, queryset):
+        """
+        Yields the instances of an unpaginated queryset in chunks, which are read
+        with `queryset.iterator()`. As the iterator does not prefetch related
+        objects, the queryset's `prefetch_related()` lookups are applied per chunk.
+        """
+        lookups = queryset._prefetch_related_lookups
+
+        for chunk in self.iter_chunks(queryset.iterator()):
+            if lookups:
+                prefetch_related_objects(chunk, *lookups)
+            yield chunk
+
+
+def _build_resources_worker(task):
+    view_class, request_state, linkages, instance_states = task
+    view = processes.get_view(view_class, request_state, 'list')
+    renderer = APIRenderer()
+
+    instances = [processes.get_instance(instance_state) for instance_state in instance_states]
+    if not linkages:
+        view.prefetch_resource_fragments(instances)
+
+    fragments = []
+    for instance in instances:
+        resource = view.build_resource(instance, linkages)
+        if not isinstance(resource, ResourceFragment):
+            resource = ResourceFragment.encode(resource, renderer)
+
+        # fragments are returned as plain values
+        fragments.append((resource.id, resource.type, resource.content))
+
+    return fragments
+
 
 class RetrieveResourceMixin(object):
     """
     Retrieve a model instance.
     """
     def retrieve(self, request, *args, **kwargs):
-        # TODO:
-        # queryset optimization hooks into `get_object()`
+        # queryset optimizations are applied through `get_object()`
         instance = self.get_object()
         include_paths = self.get_include_paths(self.get_queryset())
         linkages = list(self.group_include_paths(include_paths).keys())
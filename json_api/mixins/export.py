@@ -0,0 +1,117 @@
+from django.http import StreamingHttpResponse
+from json_api.renderers import APIRenderer
+from json_api.utils import processes
+
+
+class ExportResourceMixin(object):
+    """
+    Export the filtered collection of resources as newline-delimited JSON.
+
+    The collection is read in chunks of `export_chunk_size` resources, ordered
+    by pk. Each chunk is a pk range that is fetched with a single query, avoiding
+    both the COUNT and OFFSET queries of paginated requests. Chunks are evaluated
+    as lists, as `queryset.iterator()` does not prefetch related objects.
+
+    Set `export_processes` to serialize the chunks in a pool of worker
+    processes. Note that workers require a database that is shared across
+    processes (ie, not an in-memory SQLite database), and that the view class
+    must be importable.
+    """
+    export_media_type = 'application/x-ndjson'
+    export_chunk_size = 1000
+    export_processes = None
+
+    def export(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if self.export_processes:
+            lines = self.iter_export_parallel(queryset)
+        else:
+            lines = self.iter_export(queryset)
+
+        return StreamingHttpResponse(lines, content_type=self.export_media_type)
+
+    def get_export_ranges(self, queryset):
+        """
+        Yields (lower, upper) pk bounds, where each range contains up to
+        `export_chunk_size` resources.
+        """
+        pks = queryset.order_by('pk').values_list('pk', flat=True)
+        lower = None
+
+        while True:
+            chunk = pks if lower is None else pks.filter(pk__gt=lower)
+            chunk = list(chunk[:self.export_chunk_size])
+            if not chunk:
+                return
+
+            yield chunk[0], chunk[-1]
+            lower = chunk[-1]
+
+    def iter_export(self, queryset):
+        """
+        Yields the encoded resource objects for the queryset, one per line.
+        """
+        queryset = queryset.order_by('pk')
+        lower = None
+
+        while True:
+            chunk = queryset if lower is None else queryset.filter(pk__gt=lower)
+            instances = list(chunk[:self.export_chunk_size])
+            if not instances:
+                return
+
+            yield export_chunk(self, instances)
+            lower = instances[-1].pk
+
+    def iter_export_parallel(self, queryset):
+        """
+        Yields the encoded resource objects for the queryset, distributing the
+        pk ranges across a pool of worker processes. Results are yielded in
+        pk order.
+        """
+        model = queryset.model
+        query = queryset.query
+        request_state = processes.get_request_state(self.request)
+
+        tasks = [
+            (self.__class__, model, query, request_state, lower, upper)
+            for lower, upper in self.get_export_ranges(queryset)
+        ]
+
+        pool = self.get_export_pool()
+        for data in pool.imap(_export_worker, tasks):
+            yield data
+
+    def get_export_pool(self):
+        """
+        Returns the pool of worker processes for `iter_export_parallel()`, which
+        is shared by the requests of this process.
+        """
+        return processes.get_pool(self.export_processes)
+
+
+def export_chunk(view, instances):
+    """
+    Returns the newline-delimited resource objects for the instances.
+    """
+    renderer = APIRenderer()
+    lines = []
+
+    for instance in instances:
+        lines.append(renderer.encode(view.build_resource(instance)))
+
+    if not lines:
+        return b''
+    return b'\n'.join(lines) + b'\n'
+
+
+def _export_worker(task):
+    view_class, model, query, request_state, lower, upper = task
+    view = processes.get_view(view_class, request_state, 'export')
+
+    queryset = model._default_manager.all()
+    queryset.query = query
+    queryset = queryset.filter(pk__gte=lower, pk__lte=upper).order_by('pk')
+
+    return export_chunk(view, list(queryset))
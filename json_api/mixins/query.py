@@ -0,0 +1,267 @@
+import uuid
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.http import QueryDict
+from django.utils import six
+from django.utils.six.moves.urllib.parse import parse_qsl, urlparse
+from json_api.exceptions import ParseError
+from json_api.filters import FieldLookupFilter, get_lookup_expr, is_facet_lookup
+
+
+class QueryResourceMixin(object):
+    """
+    List the resources described by a query document, for queries that exceed
+    URL length limits (eg, long id lists). The document's members are converted
+    into their query params, and the request is handled by `list()`.
+
+    ex::
+
+        POST /books/query
+        {
+            "filter": {"author.name": "Tolkien", "id": [1, 2, 3]},
+            "sort": ["-title"],
+            "include": ["author"],
+            "page": {"number": 2},
+            "facet": {"series": 10}
+        }
+
+    Array values are joined into comma separated values. Filtering by a large
+    list of ids (more than `query_stage_size`) with an `in` filter of the view's
+    filter class on the pk or a foreign key stages the ids in a temporary table,
+    as SQLite limits the number of query parameters to 999 by default. The staged
+    lookups also filter the facet counts.
+
+    The links of the response are GET requests, which cannot describe the query.
+    Instead of the `self` and pagination links, the `page` members of the query
+    documents for the other pages are returned in `meta.pages`.
+
+    ex::
+
+        "meta": {
+            "pages": {
+                "first": {},
+                "next": {"number": 3},
+                "prev": {"number": 1}
+            }
+        }
+    """
+    query_members = ('filter', 'sort', 'include', 'page', 'facet')
+    query_stage_size = 500
+    query_link_names = ('self', 'first', 'last', 'prev', 'next')
+
+    def query(self, request, *args, **kwargs):
+        document = request.data
+        if not isinstance(document, dict):
+            raise ParseError(detail='The query document must be an object.', source={'pointer': ''})
+
+        self.staged_lookups = []
+        request._request.GET = self.get_query_params(document)
+
+        # the staged values must be read before the temporary tables are dropped.
+        self.streaming = False
+
+        try:
+            response = self.list(request, *args, **kwargs)
+        finally:
+            self.drop_staged_tables()
+
+        self.replace_query_links(response.data)
+        return response
+
+    def replace_query_links(self, data):
+        """
+        Replaces the `self` and pagination links of the response with the
+        `page` members of the query documents for the linked pages.
+        """
+        links = data.get('links') or {}
+        pages = OrderedDict(
+            (name, self.get_query_page(link)) for name, link in list(links.items())
+            if name in self.query_link_names and name != 'self' and link
+        )
+
+        links = OrderedDict(
+            (name, link) for name, link in list(links.items())
+            if name not in self.query_link_names
+        )
+
+        data.pop('links', None)
+        if links:
+            data['links'] = links
+
+        if pages:
+            meta = data.pop('meta', None) or OrderedDict()
+            meta['pages'] = pages
+            data['meta'] = meta
+
+    def get_query_page(self, link):
+        """
+        Returns the `page` member of the query document for a page link.
+        """
+        paginator = self.paginator
+        page = OrderedDict()
+
+        for param, value in parse_qsl(urlparse(link).query):
+            if param == getattr(paginator, 'page_query_param', None):
+                key = 'number'
+            elif param == getattr(paginator, 'page_size_query_param', None):
+                key = 'size'
+            elif param.startswith('page[') and param.endswith(']'):
+                key = param[len('page['):-1]
+            else:
+                continue
+
+            page[key] = int(value) if value.isdigit() else value
+
+        return page
+
+    def get_query_params(self, document):
+        """
+        Returns the `QueryDict` for the members of a query document.
+        """
+        params = QueryDict(mutable=True)
+
+        for member, value in list(document.items()):
+            if member not in self.query_members:
+                raise ParseError(
+                    detail='`%s` is not a valid query member.' % member,
+                    source={'pointer': '/%s' % member},
+                )
+
+            if member == 'page' and not isinstance(value, dict):
+                value = {'number': value}
+
+            if member in ('filter', 'page', 'facet') and not isinstance(value, dict):
+                raise ParseError(
+                    detail='`%s` must be an object.' % member,
+                    source={'pointer': '/%s' % member},
+                )
+
+            if member == 'filter':
+                for lookup, values in list(value.items()):
+                    if not self.stage_lookup(lookup, values):
+                        params['filter[%s]' % lookup] = self.encode_query_value(values)
+
+            elif member == 'facet':
+                for name, limit in list(value.items()):
+                    params['facet[%s]' % name] = '' if limit is None else self.encode_query_value(limit)
+
+            elif member == 'page':
+                for key, page in list(value.items()):
+                    params[self.get_page_param(key)] = self.encode_query_value(page)
+
+            else:
+                params[member] = self.encode_query_value(value)
+
+        return params
+
+    def encode_query_value(self, value):
+        if isinstance(value, (list, tuple)):
+            return ','.join(self.encode_query_value(item) for item in value)
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return six.text_type(value)
+
+    def get_page_param(self, key):
+        """
+        Returns the query param for a member of the `page` object. A page
+        number is given as `{"number": 2}` (or simply `2`).
+        """
+        paginator = self.paginator
+
+        if key == 'number' and hasattr(paginator, 'page_query_param'):
+            return paginator.page_query_param
+        if key == 'size' and getattr(paginator, 'page_size_query_param', None):
+            return paginator.page_size_query_param
+        return 'page[%s]' % key
+
+    def stage_lookup(self, lookup, values):
+        """
+        Determines if the values of a filter lookup are staged in a temporary
+        table, and records the lookup's column for `filter_queryset()`. Only
+        the `in` filters of the view's filter class are staged.
+        """
+        if not isinstance(values, (list, tuple)) or len(values) <= self.query_stage_size:
+            return False
+
+        queryset = self.get_queryset()
+        if connections[queryset.db].vendor != 'sqlite':
+            return False
+
+        backends = [
+            backend for backend in self.filter_backends
+            if issubclass(backend, FieldLookupFilter)
+        ]
+        if not backends:
+            return False
+
+        filter_class = backends[0]().get_filter_class(self, queryset)
+        lookup_filter = getattr(filter_class, 'base_filters', {}).get(lookup)
+        if lookup_filter is None or get_lookup_expr(lookup_filter) != 'in':
+            return False
+
+        opts = queryset.model._meta
+        if lookup_filter.name == 'pk':
+            field = target = opts.pk
+        else:
+            try:
+                field = opts.get_field(lookup_filter.name)
+            except FieldDoesNotExist:
+                return False
+
+            # only ids are staged, which are already exposed by the resource linkage.
+            if field.primary_key:
+                target = field
+            elif field.concrete and field.many_to_one:
+                target = field.related_field
+            else:
+                return False
+
+        try:
+            values = [target.to_python(value) for value in values]
+        except ValidationError:
+            raise ParseError(
+                detail='`%s` must be a list of ids.' % lookup,
+                source={'pointer': '/filter/%s' % lookup},
+            )
+
+        self.staged_lookups.append((lookup, field.column, values))
+        return True
+
+    def filter_queryset(self, queryset):
+        queryset = super(QueryResourceMixin, self).filter_queryset(queryset)
+
+        connection = connections[queryset.db]
+        db_table = connection.ops.quote_name(queryset.model._meta.db_table)
+
+        facet = getattr(self, 'excluded_facet', None)
+
+        for lookup, column, values in getattr(self, 'staged_lookups', []):
+            if facet and is_facet_lookup(lookup, facet):
+                continue
+
+            table = self.stage_values(queryset.db, values)
+            column = '%s.%s' % (db_table, connection.ops.quote_name(column))
+            queryset = queryset.extra(where=['%s IN (SELECT value FROM %s)' % (column, table)])
+
+        return queryset
+
+    def stage_values(self, using, values):
+        """
+        Inserts the values into a new temporary table, and returns its name.
+        """
+        table = 'json_api_staged_%s' % uuid.uuid4().hex
+
+        with connections[using].cursor() as cursor:
+            cursor.execute('CREATE TEMP TABLE %s (value)' % table)
+            cursor.executemany('INSERT INTO %s (value) VALUES (%%s)' % table, [[value] for value in values])
+
+        self.staged_tables = getattr(self, 'staged_tables', []) + [(using, table)]
+        return table
+
+    def drop_staged_tables(self):
+        for using, table in getattr(self, 'staged_tables', []):
+            with connections[using].cursor() as cursor:
+                cursor.execute('DROP TABLE IF EXISTS %s' % table)
+
+        self.staged_tables = []
@@ -1,17 +1,68 @@
 
+from collections import OrderedDict
 from django.db import transaction
+from django.http import StreamingHttpResponse
 from rest_framework import status
 from rest_framework.response import Response
 from json_api.exceptions import MethodNotAllowed
 
 
 class RetrieveRelationshipMixin(object):
+    """
+    Retrieve the linkage of a relationship. To-many linkage is paginated with
+    the view's paginator.
+
+    Set `streaming_relationships` to stream the complete to-many linkage
+    instead. The linkage is read with `queryset.iterator()`, and resource
+    identifiers are encoded as they are built.
+    """
+    streaming_relationships = False
+
     def retrieve_relationship(self, request, pk, relname, *args, **kwargs):
         rel = self.get_relationship(relname)
         instance = self.get_object()
-        response_data = self.build_relationship_object(rel, instance, include_linkage=True)
+
+        if rel.info.to_many and self.streaming_relationships and \
+                hasattr(request.accepted_renderer, 'render_stream'):
+            return self.stream_relationship(rel, instance)
+
+        response_data = self.build_relationship_object(rel, instance, include_linkage=True, paginate=True)
+
+        meta = self.get_default_meta()
+        if meta:
+            response_data.setdefault('meta', {}).update(meta)
+
         return Response(response_data)
 
+    def stream_relationship(self, rel, instance):
+        """
+        Stream the complete linkage of a to-many relationship.
+        """
+        related = self.get_linkage_queryset(self.get_related_data(rel, instance))
+        serializer = rel.viewset.get_identity_serializer()()
+
+        def data():
+            for related_instance in related.iterator():
+                yield serializer.to_representation(related_instance)
+
+        response_data = OrderedDict()
+
+        links = self.get_relationship_links(rel, instance)
+        if links is not None:
+            response_data['links'] = links
+
+        response_data['data'] = data()
+
+        meta = self.get_relationship_meta(rel, instance)
+        if meta:
+            response_data['meta'] = meta
+
+        renderer = self.request.accepted_renderer
+        renderer_context = self.get_renderer_context()
+        chunks = renderer.render_stream(response_data, self.request.accepted_media_type, renderer_context)
+
+        return StreamingHttpResponse(chunks, content_type=renderer.media_type)
+
 
 class ManageRelationshipMixin(object):
     def create_relationship(self, request, pk, relname, *args, **kwargs):
@@ -0,0 +1,17 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """
+    Records the deletion of a resource instance, so that incremental sync
+    requests are able to report deleted resources (see `json_api.sync`).
+    """
+    model = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=255)
+    deleted = models.DateTimeField()
+
+    # the view's sync scope of the deleted instance (eg, its owner)
+    scope = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        index_together = [('model', 'deleted')]
@@ -1,10 +1,11 @@
-
 from rest_framework.negotiation import DefaultContentNegotiation
-from json_api.parsers import APIParser
-from json_api.renderers import APIRenderer
+from json_api.parsers import APIParser, MessagePackParser
+from json_api.renderers import APIRenderer, ColumnarRenderer, MessagePackRenderer
 
 
 class APINegotiation(DefaultContentNegotiation):
+    api_parser_classes = (APIParser, MessagePackParser)
+    api_renderer_classes = (APIRenderer, ColumnarRenderer, MessagePackRenderer)
 
     def select_parser(self, request, parsers):
         parser = super(APINegotiation, self).select_parser(request, parsers)
@@ -12,7 +13,7 @@ class APINegotiation(DefaultContentNegotiation):
         # Servers MUST respond with a 415 Unsupported Media Type status code if
         # a request specifies the header Content-Type: application/vnd.api+json
         # with any media type parameters.
-        if isinstance(parser, APIParser):
+        if isinstance(parser, self.api_parser_classes):
 
             # This check needs to be done because some browsers append charset
             # information automatically to the Content-Type header
@@ -28,9 +29,12 @@ class APINegotiation(DefaultContentNegotiation):
         # instances of that media type are modified with media type parameters.
         accepts = self.get_accept_list(request)
 
-        if any(a.startswith(APIRenderer.media_type) for a in accepts):
-            if APIRenderer.media_type not in accepts:
-                from json_api import exceptions
-                raise exceptions.NotAcceptable()
+        for renderer_class in self.api_renderer_classes:
+            media_type = renderer_class.media_type
+
+            if any(a.startswith(media_type) for a in accepts):
+                if media_type not in accepts:
+                    from json_api import exceptions
+                    raise exceptions.NotAcceptable()
 
         return super(APINegotiation, self).select_renderer(request, renderers, format_suffix)
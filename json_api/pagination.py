@@ -8,16 +8,42 @@ into conformance with json-api pagination by addining the following:
 - `get_last_link()`
 - `get_links()`
 
+Page number pagination counts the queryset through a pluggable count class:
+
+- `ExactCount`: a `COUNT(*)` over the queryset.
+- `CachedCount`: an exact count that is cached for a `timeout`.
+- `EstimatedCount`: the query planner's estimate, if supported by the backend.
+- `CappedCount`: an exact count, up to a `cap` (eg, '10000+').
+
+Inexact counts do not provide a 'last' link.
+
+`HasNextPagination` does not count the queryset at all. Instead, it fetches
+an additional row to determine whether a next page exists.
+
 Reference:
 http://jsonapi.org/format/#fetching-pagination
 
 '''
 
+import json
+import hashlib
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from collections import OrderedDict
+from django.core.cache import caches
+from django.core.paginator import EmptyPage, InvalidPage, PageNotAnInteger, Paginator as DjangoPaginator
+from django.core.paginator import Page as DjangoPage
+from django.db import connections
+from django.db.models import Q
+from django.db.models.sql.datastructures import EmptyResultSet
+from django.utils import six
+from django.utils.functional import cached_property
 from rest_framework import pagination
+from rest_framework.utils import encoders
 from rest_framework.utils.urls import (
     replace_query_param, remove_query_param
 )
+from json_api.exceptions import NotFound, ParseError
+from json_api.settings import api_settings
 
 
 class PageLinksMixin(object):
@@ -47,19 +73,444 @@ class PageLinksMixin(object):
         return links
 
 
+class ExactCount(object):
+    """
+    Counts the queryset with a `COUNT(*)` query.
+    """
+
+    def get_count(self, queryset):
+        """
+        Returns a tuple of (count, exact) for the queryset.
+        """
+        return queryset.count(), True
+
+    def format_count(self, count, exact):
+        """
+        Returns the representation of the count for the response's `meta`.
+        """
+        return count
+
+
+class CachedCount(ExactCount):
+    """
+    Caches the exact count of a queryset for `timeout` seconds. Counts are
+    keyed by the queryset's SQL, which reflects both the filter parameters
+    and the view's base queryset.
+    """
+    cache_alias = 'default'
+    key_prefix = 'json_api.count'
+    timeout = 60
+
+    def get_count(self, queryset):
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0, True
+
+        key = '%s%s' % (sql, params)
+        key = '%s:%s' % (self.key_prefix, hashlib.md5(key.encode('utf-8')).hexdigest())
+
+        cache = caches[self.cache_alias]
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.timeout)
+
+        return count, True
+
+
+class EstimatedCount(ExactCount):
+    """
+    Uses the query planner's row estimate for the queryset, which is supported
+    by PostgreSQL. Backends without an estimate, and estimates below the
+    `exact_threshold`, fall back to an exact count.
+    """
+    exact_threshold = 1000
+
+    def get_count(self, queryset):
+        estimate = self.get_estimate(queryset)
+
+        if estimate is None or estimate < self.exact_threshold:
+            return super(EstimatedCount, self).get_count(queryset)
+        return estimate, False
+
+    def get_estimate(self, queryset):
+        """
+        Returns the planner's row estimate, or `None` if not supported.
+        """
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        try:
+            sql, params = queryset.query.sql_with_params()
+        except EmptyResultSet:
+            return 0
+
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN (FORMAT JSON) %s' % sql, params)
+            plan = cursor.fetchone()[0]
+
+        # psycopg2 may not decode the json result
+        if isinstance(plan, six.string_types):
+            plan = json.loads(plan)
+
+        return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CappedCount(ExactCount):
+    """
+    Counts the queryset up to the `cap`. Larger counts are reported as
+    '<cap>+', without counting the remainder of the queryset.
+    """
+    cap = 10000
+
+    def get_count(self, queryset):
+        count = queryset.order_by()[:self.cap + 1].count()
+
+        if count > self.cap:
+            return self.cap, False
+        return count, True
+
+    def format_count(self, count, exact):
+        if not exact:
+            return '%d+' % count
+        return count
+
+
+class Page(DjangoPage):
+
+    def has_next(self):
+        # Pages beyond an inexact count may still exist.
+        if not self.paginator.exact:
+            return len(self) == self.paginator.per_page
+        return super(Page, self).has_next()
+
+
+class Paginator(DjangoPaginator):
+    """
+    A Django `Paginator` that counts the object list with a count class. If
+    the count is inexact, pages are not validated against the count.
+    """
+    count_class = ExactCount
+
+    def __init__(self, *args, **kwargs):
+        count_class = kwargs.pop('count_class', None)
+        if count_class is not None:
+            self.count_class = count_class
+
+        super(Paginator, self).__init__(*args, **kwargs)
+        self.counter = self.count_class()
+
+    @cached_property
+    def _counted(self):
+        return self.counter.get_count(self.object_list)
+
+    @property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def exact(self):
+        return self._counted[1]
+
+    @property
+    def formatted_count(self):
+        return self.counter.format_count(self.count, self.exact)
+
+    def validate_number(self, number):
+        if self.exact:
+            return super(Paginator, self).validate_number(number)
+
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        if self.exact:
+            return super(Paginator, self).page(number)
+
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
+
+    def _get_page(self, *args, **kwargs):
+        return Page(*args, **kwargs)
+
+
 class PageNumberPagination(pagination.PageNumberPagination, PageLinksMixin):
+    count_class = ExactCount
+
+    # Set to include the count in the response's top-level `meta`.
+    include_count = False
+
     @property
     def paginator(self):
         return self.page.paginator
 
+    def django_paginator_class(self, *args, **kwargs):
+        kwargs.setdefault('count_class', self.count_class)
+        return Paginator(*args, **kwargs)
+
+    def get_meta(self):
+        if not self.include_count:
+            return None
+
+        return OrderedDict((
+            ('count', self.paginator.formatted_count),
+        ))
+
     def get_first_link(self):
         url = self.request.build_absolute_uri()
         return remove_query_param(url, self.page_query_param)
 
     def get_last_link(self):
+        # the last page is unknown for inexact counts
+        if not self.paginator.exact:
+            return None
+
         url = self.request.build_absolute_uri()
         page_number = self.paginator.num_pages
 
         # only add a 'last' link if it isn't going to be the same as the 'first' link.
         if page_number != 1:
             return replace_query_param(url, self.page_query_param, page_number)
+
+
+class LookaheadPage(DjangoPage):
+
+    def __init__(self, object_list, number, paginator, more):
+        super(LookaheadPage, self).__init__(object_list, number, paginator)
+        self.more = more
+
+    def has_next(self):
+        return self.more
+
+
+class LookaheadPaginator(DjangoPaginator):
+    """
+    A Django `Paginator` that does not count the object list. Pages are
+    fetched with an additional row, which determines if a next page exists.
+    """
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+
+        object_list = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not object_list and number > 1:
+            raise EmptyPage('That page contains no results')
+
+        more = len(object_list) > self.per_page
+        return LookaheadPage(object_list[:self.per_page], number, self, more)
+
+
+class HasNextPagination(PageNumberPagination):
+    """
+    A page number pagination that doesn't run a COUNT query. Provides the
+    'first', 'prev', and 'next' links, but not the 'last' link.
+    """
+    django_paginator_class = LookaheadPaginator
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = request.query_params.get(self.page_query_param, 1)
+
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=six.text_type(exc)
+            ))
+
+        self.request = request
+        return list(self.page)
+
+    def get_last_link(self):
+        return None
+
+    def get_meta(self):
+        return None
+
+
+class CursorPagination(pagination.BasePagination, PageLinksMixin):
+    """
+    A keyset pagination that uses opaque `page[after]` and `page[before]`
+    cursors, instead of page offsets. Pages are fetched with a filter on the
+    ordering fields, so deep pages are as fast as the first page, and rows
+    are not shifted between pages by concurrent inserts.
+
+    The queryset ordering (eg, as translated by `RelatedOrderingFilter`,
+    including related field sorts) is used for the page keys, with the pk
+    appended as a tiebreaker. A cursor is only valid for the ordering it was
+    created with.
+
+    Note that a 'last' link is not provided.
+    """
+    page_size = api_settings.PAGE_SIZE
+    after_query_param = 'page[after]'
+    before_query_param = 'page[before]'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.page_size:
+            return None
+
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        after = self.decode_cursor(request, self.after_query_param)
+        before = self.decode_cursor(request, self.before_query_param)
+
+        if before is not None:
+            # fetch the preceding rows in reverse, then restore the ordering.
+            queryset = queryset.filter(self.get_keyset_filter(queryset, before, reverse=True))
+            queryset = queryset.order_by(*[_invert(field) for field in self.ordering])
+            results = list(queryset[:self.page_size + 1])[::-1]
+
+            self.has_previous = len(results) > self.page_size
+            self.has_next = True
+            results = results[-self.page_size:]
+
+        else:
+            if after is not None:
+                queryset = queryset.filter(self.get_keyset_filter(queryset, after))
+            results = list(queryset[:self.page_size + 1])
+
+            self.has_previous = after is not None
+            self.has_next = len(results) > self.page_size
+            results = results[:self.page_size]
+
+        self.cursors = self.get_cursors(queryset, results)
+        return results
+
+    def get_ordering(self, queryset):
+        """
+        Returns the ordering of the queryset, with the pk as a tiebreaker.
+        """
+        query = queryset.query
+        if query.order_by:
+            ordering = list(query.order_by)
+        elif query.default_ordering:
+            ordering = list(queryset.model._meta.ordering)
+        else:
+            ordering = []
+
+        ordering = [field for field in ordering if isinstance(field, six.string_types)]
+        if not any(field.lstrip('-') in ('pk', 'id') for field in ordering):
+            ordering.append('pk')
+
+        return ordering
+
+    def get_keyset_filter(self, queryset, values, reverse=False):
+        """
+        Returns a `Q` object that selects the rows following the values
+        (or preceding, if `reverse` is set) in the ordering.
+        """
+        nulls_largest = connections[queryset.db].features.nulls_order_largest
+        keyset = Q(pk__in=[])
+        equal = Q()
+
+        for field, value in zip(self.ordering, values):
+            descending = field.startswith('-')
+            name = field.lstrip('-')
+
+            # rows that follow in ascending order are 'greater' values
+            greater = descending == reverse
+
+            if value is None:
+                # null values are either ordered first or last
+                following = Q(**{'%s__isnull' % name: False}) if greater != nulls_largest else Q(pk__in=[])
+                keyset |= equal & following
+                equal &= Q(**{'%s__isnull' % name: True})
+
+            else:
+                following = Q(**{'%s__%s' % (name, 'gt' if greater else 'lt'): value})
+                if greater == nulls_largest:
+                    following |= Q(**{'%s__isnull' % name: True})
+                keyset |= equal & following
+                equal &= Q(**{name: value})
+
+        return keyset
+
+    def get_cursors(self, queryset, results):
+        """
+        Returns the (first, last) cursors of the results.
+        """
+        if not results:
+            return None, None
+
+        fields = [field.lstrip('-') for field in self.ordering]
+        pks = [results[0].pk, results[-1].pk]
+
+        values = queryset.order_by().filter(pk__in=pks).values_list('pk', *fields)
+        values = {row[0]: list(row[1:]) for row in values}
+
+        return tuple(self.encode_cursor(values[pk]) for pk in pks)
+
+    def encode_cursor(self, values):
+        data = json.dumps([self.ordering, values], cls=encoders.JSONEncoder)
+        return urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, param):
+        cursor = request.query_params.get(param)
+        if cursor is None:
+            return None
+
+        try:
+            ordering, values = json.loads(urlsafe_b64decode(str(cursor)).decode('utf-8'))
+        except (TypeError, ValueError):
+            ordering, values = None, None
+
+        if ordering != self.ordering or not isinstance(values, list) or len(values) != len(ordering):
+            raise ParseError(
+                detail='Invalid cursor.',
+                source={'parameter': param}
+            )
+
+        return values
+
+    def get_first_link(self):
+        if not self.has_previous:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.after_query_param)
+        return remove_query_param(url, self.before_query_param)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.cursors[0] is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.after_query_param)
+        return replace_query_param(url, self.before_query_param, self.cursors[0])
+
+    def get_next_link(self):
+        if not self.has_next or self.cursors[1] is None:
+            return None
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.before_query_param)
+        return replace_query_param(url, self.after_query_param, self.cursors[1])
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else '-' + field
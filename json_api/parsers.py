@@ -1,5 +1,12 @@
 
+from django.utils import six
 from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 
 class APIParser(parsers.JSONParser):
@@ -7,6 +14,24 @@ class APIParser(parsers.JSONParser):
     media_type = 'application/vnd.api+json'
 
 
+class MessagePackParser(parsers.BaseParser):
+    """
+    Parses MessagePack-serialized data, following the json-api spec. Requires
+    `msgpack>=1.0`.
+    """
+
+    media_type = 'application/vnd.api+msgpack'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        assert msgpack is not None, 'msgpack must be installed to use `MessagePackParser`.'
+
+        try:
+            # timestamps are decoded into aware datetimes
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError('MessagePack parse error - %s' % six.text_type(exc))
+
+
 class FormParser(parsers.FormParser):
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -1,6 +1,49 @@
+from __future__ import unicode_literals
 
+import calendar
+import json
+import datetime
 from collections import OrderedDict
+from django.utils import six
 from rest_framework import renderers
+from rest_framework.compat import SHORT_SEPARATORS, LONG_SEPARATORS
+from rest_framework.utils import encoders
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ResourceFragment(object):
+    """
+    A pre-encoded resource object. Fragments are spliced into the rendered
+    document as-is, without being re-encoded.
+
+    The resource identity is accessible by key, similar to a resource object.
+    """
+
+    def __init__(self, id, type, content):
+        self.id = id
+        self.type = type
+        self.content = content
+
+    @classmethod
+    def encode(cls, resource, renderer=None):
+        """
+        Returns a fragment for a built resource object.
+        """
+        if renderer is None:
+            renderer = APIRenderer()
+        return cls(resource['id'], resource['type'], renderer.encode(resource))
+
+    def __getitem__(self, key):
+        if key not in ('id', 'type'):
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __repr__(self):
+        return '<%s: %s %s>' % (self.__class__.__name__, self.type, self.id)
 
 
 class APIRenderer(renderers.JSONRenderer):
@@ -9,3 +52,241 @@ class APIRenderer(renderers.JSONRenderer):
     """
 
     media_type = 'application/vnd.api+json'
+
+    # The approximate size (in bytes) of the chunks yielded by `render_stream()`.
+    chunk_size = 8192
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON. Documents that contain resource fragments are
+        rendered by splicing the pre-encoded fragments into the output.
+        """
+        if isinstance(data, dict) and any(_has_fragments(value) for value in data.values()):
+            return b''.join(self.iter_document(data))
+
+        return super(APIRenderer, self).render(data, accepted_media_type, renderer_context)
+
+    def encode(self, data):
+        """
+        Encode a JSON-compatible value into bytes. Resource fragments, and
+        arrays of resource fragments, are spliced into the output.
+        """
+        if isinstance(data, ResourceFragment):
+            return data.content
+
+        if _has_fragments(data):
+            return b'[' + b','.join(self.encode(item) for item in data) + b']'
+
+        separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+
+        ret = json.dumps(
+            data, cls=self.encoder_class,
+            ensure_ascii=self.ensure_ascii, separators=separators
+        )
+
+        if isinstance(ret, six.text_type):
+            # see `JSONRenderer.render()` regarding the line separators.
+            ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+            return bytes(ret.encode('utf-8'))
+        return ret
+
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render the top-level document as an iterable of encoded chunks.
+
+        Iterator values (such as generators) are rendered as arrays, and their
+        items are encoded as they are produced. Document members are rendered
+        in order, so an iterator is not consumed until the preceding members
+        have been rendered. Empty iterators are omitted from the document, with
+        the exception of the primary `data`.
+        """
+        buffer, size = [], 0
+
+        for chunk in self.iter_document(data):
+            buffer.append(chunk)
+            size += len(chunk)
+
+            if size >= self.chunk_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+
+        if buffer:
+            yield b''.join(buffer)
+
+    def iter_document(self, data):
+        """
+        Yields the encoded parts of the top-level document.
+        """
+        yield b'{'
+
+        first = True
+        for key, value in list(data.items()):
+            if not _is_iterator(value):
+                yield (b'' if first else b',') + self.encode(key) + b':' + self.encode(value)
+                first = False
+                continue
+
+            items = iter(value)
+            try:
+                item = next(items)
+            except StopIteration:
+                if key != 'data':
+                    continue
+                yield (b'' if first else b',') + self.encode(key) + b':[]'
+                first = False
+                continue
+
+            yield (b'' if first else b',') + self.encode(key) + b':['
+            yield self.encode(item)
+            for item in items:
+                yield b',' + self.encode(item)
+            yield b']'
+            first = False
+
+        yield b'}'
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renderer which serializes to MessagePack, following the json-api spec.
+
+    The rendered document has the same structure as its JSON counterpart.
+    Numbers are encoded in their smallest binary representation, map keys are
+    not quoted or delimited, and aware datetimes use the MessagePack timestamp
+    extension type. Requires `msgpack>=1.0`.
+    """
+
+    media_type = 'application/vnd.api+msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    encoder_class = encoders.JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        assert msgpack is not None, 'msgpack must be installed to use `MessagePackRenderer`.'
+
+        if data is None:
+            return bytes()
+
+        return msgpack.packb(data, default=self.default, use_bin_type=True)
+
+    def default(self, obj):
+        """
+        Converts values that are not natively supported by MessagePack.
+        """
+        if isinstance(obj, ResourceFragment):
+            return json.loads(obj.content.decode('utf-8'))
+
+        # `Timestamp.from_datetime()` loses precision before msgpack 1.0.3, and
+        # requires `datetime.timestamp()`, which is not available on Python 2.
+        if isinstance(obj, datetime.datetime) and obj.tzinfo is not None:
+            seconds = calendar.timegm(obj.utctimetuple())
+            return msgpack.Timestamp(seconds, obj.microsecond * 1000)
+
+        # defer to the JSON encoder for dates, decimals, lazy strings, etc...
+        return self.encoder_class().default(obj)
+
+
+class ColumnarRenderer(renderers.JSONRenderer):
+    """
+    Renderer which serializes to a column-oriented JSON document, suitable
+    for loading into data frames.
+
+    The primary and included resource objects are grouped by type. Each type
+    contains an array of ids, an array per attribute, and an array per
+    relationship with its linkage ids. Per-resource links are not rendered.
+
+    ex::
+
+        {
+            "data": {
+                "book": {
+                    "id": [1, 2],
+                    "attributes": {"title": ["...", "..."]},
+                    "relationships": {"author": [1, 1]}
+                }
+            }
+        }
+
+    """
+
+    media_type = 'application/vnd.api.columnar+json'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = data.copy()
+
+            for key in ('data', 'included'):
+                if data.get(key) is not None:
+                    data[key] = self.get_columns(data[key])
+
+        return super(ColumnarRenderer, self).render(data, accepted_media_type, renderer_context)
+
+    def get_columns(self, resources):
+        """
+        Returns a map of {type: columns} for a list of resource objects.
+        """
+        if isinstance(resources, dict) or isinstance(resources, ResourceFragment):
+            resources = [resources]
+
+        resources = [
+            json.loads(resource.content.decode('utf-8'))
+            if isinstance(resource, ResourceFragment) else resource
+            for resource in resources
+        ]
+
+        # collect the attribute and relationship names for each type
+        types = OrderedDict()
+        for resource in resources:
+            names = types.setdefault(resource['type'], (OrderedDict(), OrderedDict()))
+            names[0].update((name, None) for name in resource.get('attributes') or {})
+            names[1].update(
+                (name, None) for name, rel in list((resource.get('relationships') or {}).items())
+                if 'data' in rel
+            )
+
+        columns = OrderedDict()
+        for resource_type, (attributes, relationships) in list(types.items()):
+            instances = [resource for resource in resources if resource['type'] == resource_type]
+
+            column = OrderedDict((
+                ('id', [resource['id'] for resource in instances]),
+                ('attributes', OrderedDict((
+                    (name, [(resource.get('attributes') or {}).get(name) for resource in instances])
+                    for name in attributes
+                ))),
+            ))
+
+            if relationships:
+                column['relationships'] = OrderedDict((
+                    (name, [_linkage_ids(resource, name) for resource in instances])
+                    for name in relationships
+                ))
+
+            columns[resource_type] = column
+
+        return columns
+
+
+def _linkage_ids(resource, relname):
+    rel = (resource.get('relationships') or {}).get(relname) or {}
+    linkage = rel.get('data')
+
+    if linkage is None:
+        return None
+    if isinstance(linkage, dict):
+        return linkage['id']
+    return [identifier['id'] for identifier in linkage]
+
+
+def _has_fragments(value):
+    if isinstance(value, ResourceFragment):
+        return True
+    if isinstance(value, (list, tuple)):
+        return any(isinstance(item, ResourceFragment) for item in value)
+    return False
+
+
+def _is_iterator(value):
+    return hasattr(value, '__next__') or hasattr(value, 'next')
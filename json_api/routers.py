@@ -13,7 +13,22 @@ class BaseAPIRouter(routers.SimpleRouter):
     routes. Provides an additional `relname` lookup.
     """
 
-    routes = routers.SimpleRouter.routes + [
+    # The export route must precede the detail route, as the lookup would
+    # otherwise match the 'export' path.
+    routes = routers.SimpleRouter.routes[:1] + [
+        routers.Route(
+            url=r'^{prefix}/export{trailing_slash}$',
+            mapping={'get': 'export'},
+            name='{basename}-export',
+            initkwargs={'suffix': 'Export'},
+        ),
+        routers.Route(
+            url=r'^{prefix}/query{trailing_slash}$',
+            mapping={'post': 'query'},
+            name='{basename}-query',
+            initkwargs={'suffix': 'Query'},
+        ),
+    ] + routers.SimpleRouter.routes[1:] + [
         routers.Route(
             url=r'^{prefix}/{lookup}/relationships/{relname}{trailing_slash}$',
             mapping={
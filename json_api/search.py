@@ -0,0 +1,319 @@
+'''
+Full text search backed by SQLite's FTS5 extension.
+
+Each searchable viewset has a search index, which is an FTS5 virtual table that
+contains the viewset's `search_fields`. The table's rowid is the pk of the
+indexed instance, and the index is kept in sync through the model's `post_save`
+and `post_delete` signals. Search fields must be concrete fields on the model.
+
+ex::
+
+    class BookViewSet(viewsets.ResourceViewSet):
+        ...
+        filter_backends = (FullTextSearchFilter, RelatedOrderingFilter, FieldLookupFilter)
+        search_fields = ('title', 'summary')
+
+Searchable viewsets should be registered on startup (eg, in `AppConfig.ready()`),
+so that changes are indexed before the first search request:
+
+    search.register(BookViewSet)
+
+The index is created, and the existing rows are indexed, by the
+`build_search_index` management command. Until then, changes are not indexed
+and searches fall back to `icontains` lookups:
+
+    python manage.py build_search_index myapp.views.BookViewSet
+
+Search results are requested with the `filter[search]` query param, and may be
+sorted by the 'relevance' sort key (ie, `?sort=-relevance` for the most relevant
+results first). Databases other than SQLite fall back to `icontains` lookups.
+'''
+import threading
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import FloatField, Q, Value
+from django.db.models.constants import LOOKUP_SEP
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from rest_framework.filters import BaseFilterBackend
+from json_api.settings import api_settings
+
+
+class SearchIndex(object):
+    """
+    An FTS5 virtual table of the search fields of a viewset's model.
+    """
+    vendor = 'sqlite'
+
+    # The number of rows inserted per statement when building the index.
+    batch_size = 1000
+
+    def __init__(self, view_class):
+        view = view_class()
+
+        self.model = view.get_queryset().model
+        self.fields = self.get_fields(view)
+        self.table = getattr(view, 'search_table', None) or '%s_fts' % self.model._meta.db_table
+
+    def get_fields(self, view):
+        """
+        Returns the model columns for the view's `search_fields`. DRF's search
+        prefixes ('^', '=', '@', '$') are ignored.
+        """
+        opts = self.model._meta
+        fields = [field.lstrip('^=@$') for field in getattr(view, 'search_fields', None) or []]
+
+        if not fields:
+            raise ImproperlyConfigured(
+                "'%s' must define 'search_fields' to be searchable." % view.__class__.__name__
+            )
+
+        for field in fields:
+            if LOOKUP_SEP in field or not opts.get_field(field).concrete:
+                raise ImproperlyConfigured(
+                    "'%s.search_fields' must be concrete model fields. Found '%s'." %
+                    (view.__class__.__name__, field)
+                )
+
+        return fields
+
+    def is_supported(self, using=None):
+        return connections[using or 'default'].vendor == self.vendor
+
+    def quote(self, connection, name):
+        return connection.ops.quote_name(name)
+
+    def exists(self, using='default'):
+        """
+        Determines if the virtual table has been created (ie, by the
+        `build_search_index` command).
+        """
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [self.table]
+            )
+            return cursor.fetchone() is not None
+
+    def create(self, using='default'):
+        """
+        Creates the virtual table if it does not exist.
+        """
+        connection = connections[using]
+        columns = ', '.join(self.quote(connection, field) for field in self.fields)
+
+        with connection.cursor() as cursor:
+            cursor.execute('CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s)' % (
+                self.quote(connection, self.table), columns,
+            ))
+
+    def rebuild(self, using='default'):
+        """
+        Recreates the index from the model's rows. Returns the number of
+        indexed rows.
+        """
+        connection = connections[using]
+        table = self.quote(connection, self.table)
+
+        # DDL is only executed if necessary, as it commits the open transaction
+        # on Python 2.
+        if not self.exists(using):
+            self.create(using)
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % table)
+
+        rows = self.model._default_manager.using(using).order_by('pk') \
+            .values_list('pk', *self.fields).iterator()
+
+        count, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                count += self.insert(batch, using)
+                batch = []
+
+        if batch:
+            count += self.insert(batch, using)
+
+        return count
+
+    def insert(self, rows, using='default'):
+        """
+        Inserts the (pk, *fields) rows into the index.
+        """
+        connection = connections[using]
+        columns = ', '.join(['rowid'] + [self.quote(connection, field) for field in self.fields])
+        placeholders = ', '.join(['%s'] * (len(self.fields) + 1))
+
+        with connection.cursor() as cursor:
+            cursor.executemany('INSERT INTO %s (%s) VALUES (%s)' % (
+                self.quote(connection, self.table), columns, placeholders,
+            ), [list(row) for row in rows])
+
+        return len(rows)
+
+    def update(self, instance, using='default'):
+        """
+        Replaces the indexed row for the instance.
+        """
+        self.delete(instance.pk, using)
+
+        row = [instance.pk] + [getattr(instance, field) for field in self.fields]
+        self.insert([row], using)
+
+    def delete(self, pk, using='default'):
+        """
+        Removes the indexed row for the pk.
+        """
+        connection = connections[using]
+
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s WHERE rowid = %%s' % self.quote(connection, self.table), [pk])
+
+    def get_pk_column(self, connection):
+        opts = self.model._meta
+        return '%s.%s' % (self.quote(connection, opts.db_table), self.quote(connection, opts.pk.column))
+
+    def get_match_sql(self, queryset, select):
+        """
+        Returns the sql for a subquery that selects `select` from the index rows
+        matching the search query param.
+        """
+        connection = connections[queryset.db]
+        table = self.quote(connection, self.table)
+
+        return 'SELECT %s FROM %s WHERE %s MATCH %%s' % (select, table, table)
+
+    def search(self, queryset, query):
+        """
+        Filters the queryset by the search query.
+        """
+        pk_column = self.get_pk_column(connections[queryset.db])
+
+        sql = self.get_match_sql(queryset, 'rowid')
+        return queryset.extra(where=['%s IN (%s)' % (pk_column, sql)], params=[query])
+
+    def get_relevance(self, queryset, query):
+        """
+        Returns an expression for the relevance of each row to the search query,
+        where larger values are more relevant.
+        """
+        pk_column = self.get_pk_column(connections[queryset.db])
+
+        # FTS5's `rank` is the bm25 score, where lower values are more relevant.
+        sql = self.get_match_sql(queryset, '-rank') + ' AND rowid = %s' % pk_column
+        return RawSQL(sql, [query], output_field=FloatField())
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def register(view_class):
+    """
+    Returns the search index for the view class, connecting the model signals
+    that keep the index in sync on first registration.
+    """
+    with _indexes_lock:
+        index = _indexes.get(view_class)
+        if index is not None:
+            return index
+
+        index = _indexes[view_class] = SearchIndex(view_class)
+
+    # fixtures, and the rows of an index that has not been built yet, are
+    # indexed by the `build_search_index` command.
+    def update(sender, instance, using, raw=False, **kwargs):
+        if index.is_supported(using) and not raw and index.exists(using):
+            index.update(instance, using)
+
+    def delete(sender, instance, using, **kwargs):
+        if index.is_supported(using) and index.exists(using):
+            index.delete(instance.pk, using)
+
+    uid = get_dispatch_uid(view_class)
+    post_save.connect(update, sender=index.model, weak=False, dispatch_uid=uid)
+    post_delete.connect(delete, sender=index.model, weak=False, dispatch_uid=uid)
+
+    return index
+
+
+def unregister(view_class):
+    """
+    Disconnects the model signals of the view class's search index.
+    """
+    with _indexes_lock:
+        index = _indexes.pop(view_class, None)
+
+    if index is not None:
+        uid = get_dispatch_uid(view_class)
+        post_save.disconnect(sender=index.model, dispatch_uid=uid)
+        post_delete.disconnect(sender=index.model, dispatch_uid=uid)
+
+
+def get_dispatch_uid(view_class):
+    return 'json_api.search.%s.%s' % (view_class.__module__, view_class.__name__)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """
+    Filters the view's queryset by a full text search of its search index. The
+    relevance of the results is provided as the 'relevance' sort key of the
+    `RelatedOrderingFilter`.
+    """
+    search_param = 'filter[search]'
+    relevance_key = 'relevance'
+    relevance_annotation = '_search_relevance'
+
+    def get_search_query(self, request):
+        """
+        Returns the FTS5 query for the search param, where each term is quoted
+        as a string. This avoids interpreting the FTS5 query syntax.
+        """
+        terms = request.query_params.get(self.search_param, '').split()
+        return ' '.join('"%s"' % term.replace('"', '""') for term in terms)
+
+    def get_ordering_annotations(self, view):
+        return {self.relevance_key: self.relevance_annotation}
+
+    def is_relevance_ordering(self, request):
+        """
+        Determines if the results are requested in order of relevance.
+        """
+        ordering = request.query_params.get(api_settings.ORDERING_PARAM, '')
+        return self.relevance_key in [field.strip().lstrip('-') for field in ordering.split(',')]
+
+    def filter_queryset(self, request, queryset, view):
+        query = self.get_search_query(request)
+        index = register(view.__class__)
+        relevance = Value(0, FloatField())
+
+        # searches fall back to `icontains` lookups until the index is built.
+        if query and index.is_supported(queryset.db) and index.exists(queryset.db):
+            queryset = index.search(queryset, query)
+            relevance = index.get_relevance(queryset, query)
+
+        elif query:
+            queryset = self.fallback_search(queryset, index, request)
+
+        # the relevance is only annotated if necessary for ordering
+        if self.is_relevance_ordering(request):
+            queryset = queryset.annotate(**{self.relevance_annotation: relevance})
+
+        return queryset
+
+    def fallback_search(self, queryset, index, request):
+        """
+        Filters the queryset by `icontains` lookups for each search term, for
+        databases that are not supported by the index, or if the index has not
+        been built.
+        """
+        terms = request.query_params.get(self.search_param, '').split()
+
+        for term in terms:
+            condition = Q()
+            for field in index.fields:
+                condition |= Q(**{'%s__icontains' % field: term})
+            queryset = queryset.filter(condition)
+
+        return queryset
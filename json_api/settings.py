@@ -42,9 +42,12 @@ DEFAULTS.update({
     'DEFAULT_RENDERER_CLASSES': (
         'json_api.renderers.APIRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
+        'json_api.renderers.ColumnarRenderer',
+        # 'json_api.renderers.MessagePackRenderer',
     ),
     'DEFAULT_PARSER_CLASSES': (
         'json_api.parsers.APIParser',
+        # 'json_api.parsers.MessagePackParser',
         # 'json_api.parsers.FormParser',
         # 'json_api.parsers.MultiPartParser',
     ),
@@ -63,11 +66,17 @@ DEFAULTS.update({
 # JSON-API settings
 DEFAULTS.update({
     'PATH_DELIMITER': '.',
+    'LINK_MODE': 'absolute',
+    'LINK_MODE_PARAM': 'link_mode',
+    'QUERY_PLAN_CACHE_SIZE': 256,
+    'USAGE_TELEMETRY_FILE': None,
+    'USAGE_TELEMETRY_INTERVAL': 60,
     'DEFAULT_INCLUSION_CLASS': 'json_api.inclusion.RelatedResourceInclusion',
+    'DEFAULT_AGGREGATION_CLASS': 'json_api.aggregation.FieldAggregation',
 })
 
 
-IMPORT_STRINGS = drf_settings.IMPORT_STRINGS + ('DEFAULT_INCLUSION_CLASS', )
+IMPORT_STRINGS = drf_settings.IMPORT_STRINGS + ('DEFAULT_INCLUSION_CLASS', 'DEFAULT_AGGREGATION_CLASS', )
 
 
 api_settings = drf_settings.APISettings(USER_SETTINGS, DEFAULTS, IMPORT_STRINGS)
@@ -0,0 +1,191 @@
+'''
+Incremental sync allows clients to fetch the resources that have changed since
+their last sync, instead of the entire collection. Syncable viewsets define the
+`sync_field`, which is a modification timestamp of the model (eg, an `auto_now`
+datetime field).
+
+ex::
+
+    class BookViewSet(viewsets.ResourceViewSet):
+        ...
+        sync_field = 'modified'
+
+The deletion of resources is recorded in a tombstone table through the model's
+`post_delete` signal. Syncable viewsets should be registered on startup (eg, in
+`AppConfig.ready()`), so that deletions are recorded before the first sync:
+
+    sync.register(BookViewSet)
+
+A sync is requested with the `filter[updated_since]` query param. The initial
+sync omits the cursor, and returns all resources. The response contains the
+changed resources, the ids of the deleted resources, and the cursor for the
+next sync:
+
+    GET /books?filter[updated_since]
+    GET /books?filter[updated_since]=<cursor>
+
+    {
+        "data": [...],
+        "meta": {
+            "deleted": [3, 7],
+            "cursor": "..."
+        }
+    }
+
+Tombstones outlive their instances, which can no longer be checked against the
+view's queryset or permissions. By default, the ids of all deleted instances of
+the model are returned to any client. Views that restrict their queryset (eg,
+to the request user's resources) should scope their tombstones. The scope of an
+instance is recorded on deletion, and syncs only return the ids of the deleted
+resources within the request's scopes:
+
+    class BookViewSet(viewsets.ResourceViewSet):
+        ...
+        def get_sync_scope(self, instance):
+            return instance.owner_id
+
+        def get_sync_scopes(self):
+            return [self.request.user.pk]
+
+Sync responses are not paginated. Resources that are modified while a sync is
+handled may be returned again by the next sync. Tombstones are not removed
+automatically, and may be pruned with `prune()`. Clients whose cursor precedes
+the pruned tombstones must sync from the beginning.
+
+The tombstone table is provided by the `json_api` app, which must be installed:
+
+    INSTALLED_APPS = (
+        ...
+        'json_api',
+    )
+'''
+import json
+import threading
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.signals import post_delete
+from django.utils import six, timezone
+from django.utils.dateparse import parse_datetime
+from json_api.exceptions import ParseError
+
+# The tombstone model is imported when used, as importing this module does not
+# require the `json_api` app to be installed.
+
+
+def get_model_label(model):
+    opts = model._meta
+    return '%s.%s' % (opts.app_label, opts.model_name)
+
+
+def encode_cursor(timestamp):
+    data = json.dumps(timestamp.isoformat())
+    return urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor, param):
+    """
+    Returns the timestamp of a sync cursor, or `None` for the initial sync.
+    """
+    if not cursor:
+        return None
+
+    try:
+        timestamp = parse_datetime(json.loads(urlsafe_b64decode(str(cursor)).decode('utf-8')))
+    except (TypeError, ValueError):
+        timestamp = None
+
+    if timestamp is None:
+        raise ParseError(
+            detail='Invalid cursor.',
+            source={'parameter': param}
+        )
+
+    return timestamp
+
+
+_registered = set()
+_registered_views = set()
+_registered_lock = threading.Lock()
+
+
+def register(view_class, model=None):
+    """
+    Connects the `post_delete` signal that records the tombstones of the view's
+    model. Tombstones record the pk, so the view's `lookup_field` must be the pk.
+    The tombstones of a model are scoped by the first registered view.
+
+    The model is read from the view's queryset, unless it is given (eg, by a
+    view whose `get_queryset()` depends on the request).
+    """
+    with _registered_lock:
+        if view_class in _registered_views:
+            return
+
+    view = view_class()
+    if model is None:
+        model = view.get_queryset().model
+
+    lookup_field = view_class.lookup_field
+    if lookup_field != 'pk' and not model._meta.get_field(lookup_field).primary_key:
+        raise ImproperlyConfigured(
+            "'%s.lookup_field' must be the primary key to be syncable." % view_class.__name__
+        )
+
+    label = get_model_label(model)
+
+    with _registered_lock:
+        _registered_views.add(view_class)
+        if label in _registered:
+            return
+        _registered.add(label)
+
+    def delete(sender, instance, using, **kwargs):
+        from json_api.models import Tombstone
+
+        scope = view.get_sync_scope(instance)
+        Tombstone.objects.using(using).create(
+            model=label,
+            object_id=six.text_type(instance.pk),
+            deleted=timezone.now(),
+            scope='' if scope is None else six.text_type(scope),
+        )
+
+    post_delete.connect(delete, sender=model, weak=False, dispatch_uid='json_api.sync.%s' % label)
+
+
+def get_deleted_ids(model, since, scopes=None):
+    """
+    Returns the pks of the model instances deleted since the timestamp. If
+    `scopes` is given, only the tombstones recorded with one of the scopes
+    are returned.
+    """
+    from json_api.models import Tombstone
+
+    field = model._meta.pk
+    tombstones = Tombstone.objects.filter(model=get_model_label(model), deleted__gte=since)
+
+    if scopes is not None:
+        scopes = ['' if scope is None else six.text_type(scope) for scope in scopes]
+        tombstones = tombstones.filter(scope__in=scopes)
+
+    object_ids = tombstones \
+        .order_by('deleted', 'pk') \
+        .values_list('object_id', flat=True)
+
+    ids, seen = [], set()
+    for object_id in object_ids:
+        pk = field.to_python(object_id)
+        if pk not in seen:
+            seen.add(pk)
+            ids.append(pk)
+
+    return ids
+
+
+def prune(before):
+    """
+    Removes the tombstones recorded before the timestamp.
+    """
+    from json_api.models import Tombstone
+
+    Tombstone.objects.filter(deleted__lt=before).delete()
@@ -0,0 +1,290 @@
+'''
+Usage telemetry records the shapes of the filter and sort params that clients
+send to each viewset. A shape is the sorted set of filter lookups, without
+their values, and the translated ordering. For each shape, the aggregator keeps
+the number of requests and the cumulative time taken to handle them (from
+filtering the queryset until the response is finalized, which is dominated by
+the request's queries).
+
+Telemetry is enabled by setting `USAGE_TELEMETRY_FILE`. Shapes are aggregated
+in-process, and are merged into the file every `USAGE_TELEMETRY_INTERVAL`
+seconds, as well as on exit. Processes that share the file merge into it
+under an exclusive lock of the `<file>.lock` file (where `fcntl` is available).
+
+The recorded shapes are compared with the existing model indexes by the
+`advise_indexes` management command:
+
+    python manage.py advise_indexes
+
+'''
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
+from json_api.exceptions import NotFound
+from json_api.settings import api_settings
+from json_api.utils import import_class
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class UsageAggregator(object):
+    """
+    Aggregates the request count and time per (viewset, shape), and flushes
+    the aggregates to a local JSON file.
+    """
+
+    def __init__(self, path, interval=60):
+        self.path = path
+        self.interval = interval
+        self.data = {}
+        self.lock = threading.Lock()
+        self.flushed = time.time()
+
+    def record(self, viewset, shape, duration):
+        key = (viewset, json.dumps(shape, sort_keys=True))
+
+        with self.lock:
+            count, total = self.data.get(key, (0, 0.0))
+            self.data[key] = (count + 1, total + duration)
+
+            flush = time.time() - self.flushed >= self.interval
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Merges the aggregates into the file. The file is written outside of
+        the aggregator's lock, so that requests are not blocked by its I/O.
+        """
+        with self.lock:
+            data, self.data = self.data, {}
+            self.flushed = time.time()
+
+        if not data:
+            return
+
+        with self.file_lock():
+            usage = self.load(self.path)
+            for (viewset, shape), (count, total) in list(data.items()):
+                shapes = usage.setdefault(viewset, OrderedDict())
+                entry = shapes.setdefault(shape, {'count': 0, 'time': 0.0})
+                entry['count'] += count
+                entry['time'] += total
+
+            # write to a temporary file, so that readers never see a partial file.
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(usage, f, indent=2)
+            os.rename(tmp, self.path)
+
+    @contextmanager
+    def file_lock(self):
+        """
+        Holds an exclusive lock on the lock file of the path, so that the
+        load-merge-write of concurrent flushes (by any process) is serialized.
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.path + '.lock', 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def load(path):
+        """
+        Returns the usage data of the file, as {viewset: {shape: {count, time}}}.
+        """
+        try:
+            with open(path) as f:
+                return json.load(f, object_pairs_hook=OrderedDict)
+        except (IOError, ValueError):
+            return OrderedDict()
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator():
+    """
+    Returns the process's aggregator, or `None` if telemetry is disabled.
+    """
+    global _aggregator
+
+    path = api_settings.USAGE_TELEMETRY_FILE
+    if _aggregator is None and path:
+        with _aggregator_lock:
+            if _aggregator is None:
+                _aggregator = UsageAggregator(path, api_settings.USAGE_TELEMETRY_INTERVAL)
+                atexit.register(_aggregator.flush)
+
+    return _aggregator
+
+
+def get_viewset_path(view):
+    view_class = view.__class__
+    return '%s.%s' % (view_class.__module__, view_class.__name__)
+
+
+def record_shape(view, name, value):
+    """
+    Records a part of the view's query shape (eg, the filter lookups). The
+    shape is recorded when the response is finalized.
+    """
+    if get_aggregator() is None:
+        return
+
+    if getattr(view, '_usage_shape', None) is None:
+        view._usage_shape = OrderedDict()
+        view._usage_started = time.time()
+
+    view._usage_shape[name] = list(value)
+
+
+def record_view(view):
+    """
+    Records the view's query shape, if any.
+    """
+    shape = getattr(view, '_usage_shape', None)
+    aggregator = get_aggregator()
+
+    if shape and aggregator is not None:
+        aggregator.record(get_viewset_path(view), shape, time.time() - view._usage_started)
+        view._usage_shape = None
+
+
+def get_lookup_column(model, lookup):
+    """
+    Returns the (model, field name) of the column that is compared by a '__'
+    delimited lookup or ordering, or `None` if the column is a primary key.
+    Relationships are traversed, as the related column is the one compared.
+    """
+    parts = lookup.lstrip('-').split(LOOKUP_SEP)
+
+    for index, part in enumerate(parts):
+        if part == 'pk':
+            return None
+
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            # the remainder is a lookup expression (eg, 'icontains')
+            return None
+
+        remainder = parts[index + 1:]
+        if field.is_relation and field.related_model is not None and remainder:
+            try:
+                field.related_model._meta.get_field(remainder[0])
+            except FieldDoesNotExist:
+                pass
+            else:
+                model = field.related_model
+                continue
+
+        if not getattr(field, 'concrete', False) or field.primary_key:
+            return None
+        return model, field.name
+
+    return None
+
+
+def get_shape_columns(view, paths):
+    """
+    Returns the (model, field name) columns for the filter lookups or the
+    ordering of a shape. Relationship paths are translated through the
+    related views.
+    """
+    columns = []
+    for path in paths:
+        column = _get_path_column(view, path)
+        if column is not None and column not in columns:
+            columns.append(column)
+
+    return columns
+
+
+def _get_path_column(view, path):
+    try:
+        relname, subpath = path.split(api_settings.PATH_DELIMITER, 1)
+    except ValueError:
+        return get_lookup_column(view.get_queryset().model, path)
+
+    try:
+        rel = view.get_relationship(relname)
+    except NotFound:
+        return None
+    return _get_path_column(rel.viewset, subpath)
+
+
+def is_indexed(model, names):
+    """
+    Determines if the columns are the leading columns of an existing index.
+    """
+    opts = model._meta
+    names = tuple(names)
+
+    if len(names) == 1:
+        field = opts.get_field(names[0])
+        if field.primary_key or field.unique or field.db_index:
+            return True
+
+    for together in list(opts.index_together) + list(opts.unique_together):
+        if tuple(together[:len(names)]) == names:
+            return True
+
+    return False
+
+
+def get_index_proposals(usage):
+    """
+    Returns a list of (model, field names, count, time) for the indexes that
+    are missing for the recorded shapes, ordered by their cumulative time.
+    Each column is proposed as a single-column index, and the filter and sort
+    columns of the primary model are proposed as a composite index.
+    """
+    proposals = OrderedDict()
+
+    for viewset, shapes in list(usage.items()):
+        try:
+            view = import_class(viewset)()
+        except (ImportError, AttributeError):
+            continue
+
+        model = view.get_queryset().model
+
+        for shape, stats in list(shapes.items()):
+            shape = json.loads(shape)
+            columns = get_shape_columns(view, shape.get('filter', []) + shape.get('sort', []))
+
+            candidates = [[column] for column in columns]
+            local = [column for column in columns if column[0] is model]
+            if len(local) > 1:
+                candidates.append(local)
+
+            for candidate in candidates:
+                key = (candidate[0][0], tuple(name for _, name in candidate))
+                if is_indexed(*key):
+                    continue
+
+                count, total = proposals.get(key, (0, 0.0))
+                proposals[key] = (count + stats['count'], total + stats['time'])
+
+    proposals = [key + value for key, value in list(proposals.items())]
+    return sorted(proposals, key=lambda proposal: (-proposal[3], -proposal[2]))
@@ -1,5 +1,7 @@
 
 from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models.constants import LOOKUP_SEP
 from rest_framework.utils.model_meta import (
     get_field_info, FieldInfo, _merge_relationships
 )
@@ -53,3 +55,26 @@ def verbose_name(model):
         return verbose_name(opts.proxy_for_model)
 
     return opts.verbose_name.lower()
+
+
+def is_to_many_lookup(model, lookup):
+    """
+    Determines if a '__' delimited lookup (or ordering) traverses a to-many
+    relationship. Filtering or ordering across these relationships joins
+    multiple rows per instance.
+    """
+    for part in lookup.split(LOOKUP_SEP):
+        try:
+            field = model._meta.get_field(part)
+        except FieldDoesNotExist:
+            return False
+
+        if not field.is_relation or field.related_model is None:
+            return False
+
+        if field.many_to_many or field.one_to_many:
+            return True
+
+        model = field.related_model
+
+    return False
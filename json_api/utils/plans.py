@@ -0,0 +1,93 @@
+'''
+Query plans are the compiled form of a request's query parameters, such as the
+FilterSet subset class for the filter params, the translated ordering for the
+sort param, and the validated include paths.
+
+Building a plan requires walking the related viewsets and their serializers,
+while most requests share a small number of query shapes. Plans are cached in
+an LRU cache per viewset class, keyed by the normalized parameters. The size
+of each cache is set by the `QUERY_PLAN_CACHE_SIZE` setting, where `0`
+disables caching.
+
+Note that validation errors are raised while building a plan, so only valid
+plans are cached.
+'''
+import threading
+import weakref
+from collections import OrderedDict
+from json_api.settings import api_settings
+
+
+class LRUCache(object):
+    """
+    A thread-safe mapping of up to `maxsize` items, which evicts the least
+    recently used item.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                return default
+
+            # reinsert as the most recently used item
+            self.data[key] = value
+            return value
+
+    def set(self, key, value):
+        if self.maxsize <= 0:
+            return
+
+        with self.lock:
+            self.data.pop(key, None)
+            self.data[key] = value
+
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+
+    def __len__(self):
+        return len(self.data)
+
+
+_caches = weakref.WeakKeyDictionary()
+_caches_lock = threading.Lock()
+_missing = object()
+
+
+def get_plan_cache(view):
+    """
+    Returns the plan cache for the view's class.
+    """
+    view_class = view.__class__
+
+    with _caches_lock:
+        cache = _caches.get(view_class)
+        if cache is None:
+            cache = _caches[view_class] = LRUCache(api_settings.QUERY_PLAN_CACHE_SIZE)
+
+    return cache
+
+
+def get_plan(view, key, build):
+    """
+    Returns the cached plan for the view and key. If the plan is not cached,
+    it is built by calling `build()`.
+    """
+    cache = get_plan_cache(view)
+
+    plan = cache.get(key, _missing)
+    if plan is _missing:
+        plan = build()
+        cache.set(key, plan)
+
+    return plan
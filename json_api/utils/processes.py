@@ -0,0 +1,133 @@
+'''
+Helpers for building resources in worker processes. Requests, views, and
+querysets are not sent to workers directly, as they are either unpicklable
+or would be evaluated when pickled.
+'''
+import multiprocessing
+import os
+import threading
+from django.core.urlresolvers import resolve
+from django.db import connections
+from django.http import HttpRequest, QueryDict
+from django.utils import six
+
+
+# connections inherited by a worker process
+_inherited_connections = []
+
+
+# pools of worker processes, by the (pid, processes) of the owning process
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(processes):
+    """
+    Returns the pool of worker processes, which is created on first use and
+    shared by the requests of this process. Forked processes (eg, the workers
+    of a pre-fork server) do not use the pools of their parent.
+    """
+    key = (os.getpid(), processes)
+
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = multiprocessing.Pool(processes, initializer=_init_worker)
+
+    return pool
+
+
+def _init_worker():
+    # Connections inherited from the parent process share its socket, and must
+    # neither be used nor closed by the worker. A reference is kept so that
+    # they're not finalized, and the worker opens its own connections.
+    for conn in connections.all():
+        _inherited_connections.append(conn.connection)
+        conn.connection = None
+
+
+def get_request_state(request):
+    """
+    Returns the picklable state of a request that is necessary for building
+    resource objects. This includes the META (ie, for reversing absolute URLs),
+    the query params (eg, the link mode), and the pk of the authenticated user.
+    The query params are read from the request, as they may have been replaced
+    (eg, by the query document of `QueryResourceMixin`).
+    """
+    meta = {
+        key: value for key, value in list(request.META.items())
+        if isinstance(value, six.string_types)
+    }
+
+    user = getattr(request, 'user', None)
+    user_pk = user.pk if user is not None and user.is_authenticated() else None
+
+    return meta, request.path_info, request.GET.urlencode(), user_pk
+
+
+def get_view(view_class, request_state, action=None):
+    """
+    Returns an instance of the view class for a request rebuilt from its
+    request state. The request's user is reloaded, and is not authenticated
+    again by the view's authenticators.
+    """
+    meta, path, query_string, user_pk = request_state
+
+    http_request = HttpRequest()
+    http_request.method = 'GET'
+    http_request.META = meta
+    http_request.GET = QueryDict(query_string)
+    http_request.path = http_request.path_info = path
+    http_request.resolver_match = resolve(path)
+
+    view = view_class()
+    view.args, view.kwargs = (), http_request.resolver_match.kwargs
+    view.format_kwarg = None
+    view.action_map = {'get': action}
+
+    view.request = view.initialize_request(http_request)
+    view.request.user = get_user(user_pk)
+    view.action = action
+
+    return view
+
+
+def get_user(pk):
+    """
+    Returns the user of a request state, or an anonymous user.
+    """
+    # the auth models are imported when used, as the auth app may not be installed
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.models import AnonymousUser
+
+    if pk is None:
+        return AnonymousUser()
+
+    user_model = get_user_model()
+    return user_model._default_manager.get(pk=pk)
+
+
+def get_instance_state(instance, annotations=()):
+    """
+    Returns the model class, concrete field values, and the given annotations
+    of an instance, which are sent to workers instead of the instance.
+    """
+    opts = instance._meta
+    values = {field.attname: getattr(instance, field.attname) for field in opts.concrete_fields}
+    annotations = {name: getattr(instance, name) for name in annotations if hasattr(instance, name)}
+
+    return instance.__class__, values, annotations
+
+
+def get_instance(instance_state):
+    """
+    Returns an instance rebuilt from its instance state.
+    """
+    model, values, annotations = instance_state
+    instance = model(**values)
+    instance._state.adding = False
+
+    for name, value in list(annotations.items()):
+        setattr(instance, name, value)
+
+    return instance
@@ -13,12 +13,15 @@ class rel(object):
     *viewset* The viewset that manages the related resource collection.
     *attname* The name used to access the attribute on the resource.
               Defaults to relname if not provided.
+    *count*   Include the number of related objects in the relationship
+              object's meta. Only applies to to-many relationships.
 
     """
-    def __init__(self, relname, viewset, attname=None):
+    def __init__(self, relname, viewset, attname=None, count=False):
         self.relname = relname
         self.viewset = viewset
         self.attname = relname if attname is None else attname
+        self.count = count
 
     def viewset():
         def fget(self):
@@ -1,6 +1,6 @@
 
 from collections import OrderedDict
-from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
 
 
 def get_attribute_attnames(view):
@@ -37,3 +37,106 @@ def get_field_attnames(view):
     fields_map = get_attribute_attnames(view)
     fields_map.update(get_rel_attnames(view))
     return fields_map
+
+
+def get_related_paths(view):
+    """
+    Return a tuple of (select_related paths, prefetch_related paths) for a
+    view. The paths are derived from the sources of the view's serializer
+    fields, and describe the related objects that are accessed while
+    rendering the resource attributes.
+
+    ex::
+
+        source='series.title'   => select_related('series')
+        source='chapter_set'    => prefetch_related('chapter_set')
+    """
+    serializer_class = getattr(view, 'serializer_class')
+    if serializer_class is None:
+        raise ImproperlyConfigured(
+            "Cannot use 'get_related_paths' on a view which "
+            "does not have a 'serializer_class'."
+        )
+
+    model = serializer_class.Meta.model
+    fields = [
+        field for field in list(serializer_class().fields.values())
+        if not getattr(field, 'write_only', False)
+    ]
+
+    select_related, prefetch_related = [], []
+    for field in fields:
+        # related fields may only need the related pk, which is available
+        # on the instance without an additional query.
+        pk_only = getattr(field, 'use_pk_only_optimization', lambda: False)()
+        select_path, prefetch_path = _resolve_source_path(model, field.source, pk_only)
+
+        if prefetch_path and prefetch_path not in prefetch_related:
+            prefetch_related.append(prefetch_path)
+        elif select_path and select_path not in select_related:
+            select_related.append(select_path)
+
+    return select_related, prefetch_related
+
+
+def get_path_fields(model, path):
+    """
+    Return the relation fields along a '__' delimited path of a model, such
+    as the paths returned by `get_related_paths()`.
+    """
+    fields = []
+    for name in path.split('__'):
+        field = _get_model_field(model, name)
+        fields.append(field)
+        model = field.related_model
+
+    return fields
+
+
+def _resolve_source_path(model, source, pk_only=False):
+    # Walk a '.' delimited field source across the model's relationships.
+    # To-one relationships are traversed with select_related, while to-many
+    # relationships are fetched (along with the remainder of the path) with
+    # prefetch_related.
+    parts = [part for part in source.split('.') if part and part != '*']
+    path = []
+    to_many = False
+
+    for index, part in enumerate(parts):
+        field = _get_model_field(model, part)
+        if field is None or not field.is_relation or field.related_model is None:
+            break
+
+        # forward relationships have a concrete field, reverse relationships
+        # are accessed by their accessor name.
+        forward = hasattr(field, 'attname')
+        name = field.name if forward else field.get_accessor_name()
+
+        if field.many_to_many or field.one_to_many:
+            to_many = True
+
+        # the last forward to-one relationship may only need the related pk.
+        elif forward and pk_only and not to_many and index == len(parts) - 1:
+            break
+
+        path.append(name)
+        model = field.related_model
+
+    path = '__'.join(path)
+    if to_many:
+        return None, path
+    return path or None, None
+
+
+def _get_model_field(model, name):
+    # Serializer sources use accessor names for reverse relationships
+    # (eg, 'book_set'), which are not accepted by `get_field()`.
+    opts = model._meta
+    try:
+        return opts.get_field(name)
+    except FieldDoesNotExist:
+        pass
+
+    for relation in opts.related_objects:
+        if relation.get_accessor_name() == name:
+            return relation
@@ -1,11 +1,17 @@
 
 from collections import OrderedDict
+from django.core.urlresolvers import NoReverseMatch
 from rest_framework.request import Request
 from rest_framework.views import APIView
 from json_api.utils.reverse import reverse
+from json_api.renderers import ResourceFragment
+from json_api.settings import api_settings
 from json_api import routers, exceptions
 
 
+LINK_MODES = ('absolute', 'relative', 'none')
+
+
 class ResourceView(APIView):
     """
     Base class for all json-api views. Contains some base machinery necessary
@@ -21,6 +27,13 @@ class ResourceView(APIView):
 
     allow_client_generated_ids = False
 
+    # Controls how resource and relationship links are rendered. One of:
+    # - 'absolute': absolute URLs.
+    # - 'relative': URLs relative to the API root.
+    # - 'none': resource and relationship links are omitted.
+    link_mode = api_settings.LINK_MODE
+    link_mode_param = api_settings.LINK_MODE_PARAM
+
     # Dispatch methods
 
     def initialize_request(self, request, *args, **kwargs):
@@ -220,6 +233,61 @@ class ResourceView(APIView):
 
     # Response building methods
 
+    def get_link_mode(self):
+        """
+        Returns the link mode for the current request. The view's `link_mode`
+        may be overridden by the `link_mode_param` query parameter.
+        """
+        mode = self.link_mode
+        request = self.request
+
+        if self.link_mode_param and isinstance(request, Request):
+            mode = request.query_params.get(self.link_mode_param, mode)
+
+        if mode not in LINK_MODES:
+            raise exceptions.ParseError(
+                detail='`%s` is not a valid link mode.' % mode,
+                source={'parameter': self.link_mode_param}
+            )
+
+        return mode
+
+    def get_api_root(self):
+        """
+        Returns the absolute URL of the API root, which relative links are
+        relative to.
+        """
+        # related viewsets are reused across requests, so cache per request.
+        cached = getattr(self, '_api_root', None)
+        if cached is not None and cached[0] is self.request:
+            return cached[1]
+
+        try:
+            root = reverse('api-root', self.request)
+        except NoReverseMatch:
+            root = self.request.build_absolute_uri('/')
+
+        self._api_root = (self.request, root)
+        return root
+
+    def format_links(self, links, relative=None):
+        """
+        Formats a links object's URLs in accordance with the link mode.
+        URLs are made relative to the API root if `relative` is set. By
+        default, this is determined by the current link mode.
+        """
+        if relative is None:
+            relative = self.get_link_mode() == 'relative'
+
+        if not relative:
+            return links
+
+        root = self.get_api_root()
+        return links.__class__(
+            (name, link[len(root):] if link.startswith(root) else link)
+            for name, link in list(links.items())
+        )
+
     def get_default_links(self):
         """
         The default top-level links for the current request. Contains the
@@ -282,16 +350,64 @@ class ResourceView(APIView):
     def get_resource_meta(self, instance):
         return None
 
+    def get_resource_version(self, instance):
+        """
+        Returns the version of a resource instance (eg, a modification
+        timestamp), which identifies its pre-encoded fragments. Fragments are
+        not used if the version is `None`.
+        """
+        return None
+
+    def get_resource_fragment(self, resource_type, resource_id, version):
+        """
+        Returns a pre-encoded `ResourceFragment` for the (type, id, version),
+        or `None` if no fragment is available.
+        """
+        return None
+
+    def set_resource_fragment(self, fragment, version):
+        """
+        Called with the encoded fragment of a newly built resource object, so
+        that it may be stored for later use by `get_resource_fragment()`.
+        """
+        pass
+
+    def prefetch_resource_fragments(self, instances):
+        """
+        Called with a list of instances before their resource objects are
+        built, so that their versions and fragments may be fetched together.
+        """
+        pass
+
     def build_resource(self, instance, linkages=None):
         """
         Returns a 'resource object' for a resource instance, in conformance with:
         http://jsonapi.org/format/#document-resource-objects
+
+        If the resource is versioned, a pre-encoded `ResourceFragment` may be
+        returned instead. Fragments are not used when linkage is requested.
         """
         subtype = self.get_resource_type(instance)
         subtype = self.get_subtypes().get(subtype)
         if subtype is not None:
             return subtype.viewset.build_resource(instance, linkages)
 
+        version = None if linkages else self.get_resource_version(instance)
+        if version is not None:
+            fragment = self.get_resource_fragment(
+                self.get_resource_type(instance), self.get_resource_id(instance), version
+            )
+            if fragment is not None:
+                return fragment
+
+        resource = self._build_resource(instance, linkages)
+
+        if version is not None:
+            self.set_resource_fragment(ResourceFragment.encode(resource), version)
+
+        return resource
+
+    def _build_resource(self, instance, linkages=None):
         data = OrderedDict((
             ('id', self.get_resource_id(instance)),
             ('type', self.get_resource_type(instance)),
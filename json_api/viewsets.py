@@ -9,6 +9,7 @@ class GenericResourceViewSet(ViewSetMixin, generics.GenericResourceView):
 
 class ReadOnlyResourceViewSet(mixins.RetrieveResourceMixin,
                               mixins.ListResourceMixin,
+                              mixins.ExportResourceMixin,
                               mixins.RetrieveRelatedResourceMixin,
                               mixins.RetrieveRelationshipMixin,
                               GenericResourceViewSet):
@@ -20,6 +21,7 @@ class ResourceViewSet(mixins.CreateResourceMixin,
                       mixins.UpdateResourceMixin,
                       mixins.DestroyResourceMixin,
                       mixins.ListResourceMixin,
+                      mixins.ExportResourceMixin,
                       mixins.RetrieveRelatedResourceMixin,
                       mixins.ManageRelatedResourceMixin,
                       mixins.RetrieveRelationshipMixin,
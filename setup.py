@@ -43,6 +43,9 @@ setup(
     author='Ryan P Kilby',
     author_email='rpkilby@ncsu.edu',
     install_requires=['djangorestframework>=3.2,<3.4,!=3.2.3', 'djangorestframework-filters'],
+    extras_require={
+        'msgpack': ['msgpack>=1.0'],
+    },
     packages=find_packages(exclude=('tests', )),
 
     tests_require=['django>=1.8,<1.10', 'fantasy-database'],
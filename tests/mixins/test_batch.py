@@ -0,0 +1,42 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+
+class BatchResources(TestCase):
+    fixtures = ['fantasy-database']
+
+    def get(self, ids, **params):
+        params['filter[id]'] = ids
+        return self.client.get(reverse('book-list'), params)
+
+    def test_requested_order(self):
+        response = self.get('3,1,2')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['id'] for r in response.data['data']], [3, 1, 2])
+        self.assertNotIn('meta', response.data)
+
+        # batches are not paginated
+        self.assertNotIn('next', response.data['links'])
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            self.get('1,2')
+
+    def test_missing(self):
+        response = self.get('2,999,1,999')
+
+        self.assertEqual([r['id'] for r in response.data['data']], [2, 1])
+        self.assertEqual(response.data['meta'], {'missing': [999]})
+
+    def test_include(self):
+        response = self.get('1', include='author')
+
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(response.data['included'][0]['type'], 'author')
+
+    def test_invalid_id(self):
+        response = self.get('1,a')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'filter[id]'})
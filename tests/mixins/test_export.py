@@ -0,0 +1,92 @@
+import json
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from django.utils import six
+from rest_framework.test import APIRequestFactory
+from json_api.fantasy.views import BookView
+from json_api.mixins import export
+from json_api.utils import processes
+
+from django_fantasy import models
+
+factory = APIRequestFactory()
+
+
+class InProcessPool(object):
+    """
+    Runs the worker tasks in the test process, which shares the test database.
+    """
+    def imap(self, func, iterable):
+        return six.moves.map(func, iterable)
+
+
+class ParallelBookView(BookView):
+    export_chunk_size = 2
+    export_processes = 2
+
+    def get_export_pool(self):
+        return InProcessPool()
+
+
+class ExportResources(TestCase):
+    fixtures = ['fantasy-database']
+
+    def export(self, **params):
+        response = self.client.get(reverse('book-export'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        return [json.loads(line) for line in content.splitlines()]
+
+    def test_export(self):
+        resources = self.export()
+
+        expected = list(models.Book.objects.order_by('pk').values_list('pk', flat=True))
+        self.assertEqual([r['id'] for r in resources], expected)
+        self.assertEqual(resources[0]['type'], 'book')
+        self.assertIn('attributes', resources[0])
+
+    def test_export_chunks(self):
+        from json_api.fantasy.views import BookView
+
+        chunk_size = BookView.export_chunk_size
+        BookView.export_chunk_size = 2
+        try:
+            resources = self.export()
+        finally:
+            BookView.export_chunk_size = chunk_size
+
+        self.assertEqual(len(resources), models.Book.objects.count())
+
+    def test_export_processes(self):
+        view = ParallelBookView.as_view({'get': 'export'})
+        response = view(factory.get(reverse('book-export')))
+
+        content = b''.join(response.streaming_content).decode('utf-8')
+        resources = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(resources, self.export())
+
+    def test_export_processes_params(self):
+        class SerialBookView(ParallelBookView):
+            export_processes = None
+
+        def export(view_class):
+            view = view_class.as_view({'get': 'export'})
+            response = view(factory.get(reverse('book-export'), {'link_mode': 'relative'}))
+            return b''.join(response.streaming_content)
+
+        # the workers build the resources for the request's query params
+        content = export(ParallelBookView)
+        self.assertEqual(content, export(SerialBookView))
+        self.assertIn(b'"self":"books/', content)
+
+    def test_export_worker(self):
+        request = self.client.get(reverse('book-export')).wsgi_request
+        queryset = models.Book.objects.all()
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True))
+
+        task = (BookView, models.Book, queryset.query, processes.get_request_state(request), pks[1], pks[2])
+        lines = export._export_worker(task).decode('utf-8').splitlines()
+
+        self.assertEqual([json.loads(line)['id'] for line in lines], pks[1:3])
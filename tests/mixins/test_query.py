@@ -0,0 +1,169 @@
+import json
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+from rest_framework.test import APIRequestFactory
+from json_api import filters, inclusion, mixins, pagination
+from json_api.utils.rels import rel
+
+from django_fantasy import models
+from tests import models as test_models, views
+
+factory = APIRequestFactory()
+
+
+class PageNumberPagination(pagination.PageNumberPagination):
+    page_size = 2
+
+
+class AuthorView(views.ListMixin, views.AuthorView):
+    relationships = None
+
+
+class BookView(mixins.QueryResourceMixin, views.ListMixin, views.BookView):
+    filter_backends = (filters.RelatedOrderingFilter, filters.FieldLookupFilter, )
+    pagination_class = PageNumberPagination
+    inclusion_class = inclusion.RelatedResourceInclusion
+    include_rels = '__all__'
+    ordering_fields = '__all__'
+    filter_fields = {'id': ['in'], 'author': ['exact']}
+    query_stage_size = 2
+
+    relationships = [
+        rel('author', 'tests.mixins.test_query.AuthorView'),
+    ]
+
+    def post(self, request, *args, **kwargs):
+        return self.query(request, *args, **kwargs)
+
+
+class QueryDocuments(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bob = test_models.Author.objects.create(name="Bob")
+
+        for title in ('A', 'B', 'C'):
+            test_models.Book.objects.create(
+                author=cls.bob,
+                cover=test_models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def query(self, document):
+        request = factory.post('/', json.dumps(document), content_type='application/vnd.api+json')
+        return BookView.as_view()(request)
+
+    def test_sort_and_include(self):
+        response = self.query({
+            'sort': ['-title'],
+            'include': ['author'],
+        })
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual([r['attributes']['title'] for r in response.data['data']], ['C', 'B'])
+        self.assertEqual(response.data['included'][0]['type'], 'author')
+
+    def test_pages(self):
+        response = self.query({
+            'filter': {'author': self.bob.pk},
+            'sort': ['title'],
+            'page': {'number': 2},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['attributes']['title'] for r in response.data['data']], ['C'])
+
+        # the links are GET requests, which would not include the query
+        self.assertNotIn('links', response.data)
+        self.assertEqual(response.data['meta']['pages'], {
+            'first': {},
+            'last': {'number': 2},
+            'prev': {},
+        })
+
+        response = self.query({'sort': ['title']})
+        self.assertEqual(response.data['meta']['pages'], {
+            'first': {},
+            'last': {'number': 2},
+            'next': {'number': 2},
+        })
+
+    def test_staged_facets(self):
+        alice = test_models.Author.objects.create(name="Alice")
+        book = test_models.Book.objects.create(
+            author=alice,
+            cover=test_models.Cover.objects.create(text='D'),
+            title='D',
+        )
+
+        pks = list(test_models.Book.objects.filter(title__in=['A', 'B']).values_list('pk', flat=True))
+        response = self.query({
+            'filter': {'id__in': pks + [book.pk], 'author': self.bob.pk},
+            'facet': {'author': None},
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 2)
+
+        # the facet excludes its own filter, but not the staged ids
+        self.assertEqual(response.data['meta']['facets'], {'author': [
+            {'value': self.bob.pk, 'count': 2},
+            {'value': alice.pk, 'count': 1},
+        ]})
+
+    def test_staged_values(self):
+        pks = list(test_models.Book.objects.values_list('pk', flat=True)[:2])
+
+        # exceeds SQLite's default limit of 999 query parameters
+        values = pks + list(range(100000, 102000))
+        response = self.query({'filter': {'id__in': values}})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(r['id'] for r in response.data['data']), sorted(pks))
+
+    def test_unstaged_lookup(self):
+        test_models.Book.objects.create(
+            author=test_models.Author.objects.create(name="Alice"),
+            cover=test_models.Cover.objects.create(text='D'),
+            title='D',
+        )
+
+        # `author__in` is not a filter of the view, regardless of the number of values
+        values = [self.bob.pk] + list(range(100000, 100010))
+        response = self.query({'filter': {'author__in': values}, 'sort': ['-title']})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['attributes']['title'] for r in response.data['data']], ['D', 'C'])
+
+    def test_invalid_staged_values(self):
+        response = self.query({'filter': {'id__in': [{'id': 1}, 2, 3]}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'pointer': '/filter/id__in'})
+
+    def test_fields_member(self):
+        response = self.query({'fields': {'book': ['title']}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'pointer': '/fields'})
+
+
+class QueryResources(TestCase):
+    fixtures = ['fantasy-database']
+
+    def query(self, document):
+        return self.client.post(
+            reverse('book-query'),
+            data=json.dumps(document),
+            content_type='application/vnd.api+json',
+        )
+
+    def test_id_list(self):
+        response = self.query({'filter': {'id': [3, 1, 999]}})
+
+        self.assertEqual([r['id'] for r in response.data['data']], [3, 1])
+        self.assertEqual(response.data['meta'], {'missing': [999]})
+
+    def test_invalid_member(self):
+        response = self.query({'filters': {}})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'pointer': '/filters'})
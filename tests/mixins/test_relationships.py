@@ -5,6 +5,7 @@ from django.test import TestCase
 from django.core.urlresolvers import reverse
 from rest_framework import status
 from rest_framework.test import APIRequestFactory
+from json_api import pagination
 
 from django_fantasy import models
 
@@ -340,3 +341,59 @@ class ToManyRelationships(TestCase):
         lotr = models.Series.objects.get(pk=1)
         self.assertEqual(lotr.title, 'The Lord of the Rings')
         self.assertEqual(lotr.book_set.count(), 0)
+
+
+class PaginatedRelationships(TestCase):
+    fixtures = ['fantasy-database']
+
+    def get(self, **attrs):
+        from json_api.fantasy.views import SeriesView
+
+        originals = {name: getattr(SeriesView, name) for name in attrs}
+        for name, value in list(attrs.items()):
+            setattr(SeriesView, name, value)
+
+        try:
+            response = self.client.get(
+                reverse('series-relationship', kwargs={'pk': 1, 'relname': 'books'}),
+            )
+        finally:
+            for name, value in list(originals.items()):
+                setattr(SeriesView, name, value)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_paginated_linkage(self):
+        class Pagination(pagination.PageNumberPagination):
+            page_size = 2
+
+        response = self.get(pagination_class=Pagination)
+
+        self.assertEqual(response.data['data'], [
+            {'type': 'book', 'id': 1},
+            {'type': 'book', 'id': 2},
+        ])
+
+        links = response.data['links']
+        self.assertEqual(links['self'], 'http://testserver/series/1/relationships/books/')
+        self.assertEqual(links['next'], 'http://testserver/series/1/relationships/books/?page=2')
+        self.assertEqual(links['last'], 'http://testserver/series/1/relationships/books/?page=2')
+
+    def test_unpaginated_linkage(self):
+        response = self.get(pagination_class=None)
+
+        self.assertEqual([r['id'] for r in response.data['data']], [1, 2, 3])
+        self.assertNotIn('next', response.data['links'])
+
+    def test_streamed_linkage(self):
+        response = self.get(streaming_relationships=True)
+        self.assertTrue(response.streaming)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(content['data'], [
+            {'type': 'book', 'id': 1},
+            {'type': 'book', 'id': 2},
+            {'type': 'book', 'id': 3},
+        ])
+        self.assertIn('self', content['links'])
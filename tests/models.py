@@ -59,3 +59,4 @@ class Comment(models.Model):
     author = models.ForeignKey(Person)
     article = models.ForeignKey(Article)
     body = models.CharField(max_length=100)
+    updated = models.DateTimeField(auto_now=True)
@@ -12,6 +12,7 @@ INSTALLED_APPS = (
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django_fantasy',
+    'json_api',
     'tests',
 )
 
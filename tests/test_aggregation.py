@@ -0,0 +1,86 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from json_api import filters
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class BookView(views.ListMixin, views.BookView):
+    filter_backends = (filters.FieldLookupFilter, )
+    filter_fields = ['author']
+    aggregate_fields = '__all__'
+    relationships = None
+
+
+class AggregationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.bob = models.Author.objects.create(name="Bob")
+        alice = models.Author.objects.create(name="Alice")
+
+        for title, author in [('A', cls.bob), ('B', alice), ('C', cls.bob)]:
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def get(self, params):
+        return BookView.as_view()(factory.get('/', params))
+
+    def test_aggregates(self):
+        response = self.get({
+            'filter[author]': self.bob.pk,
+            'aggregate[id]': 'count',
+            'aggregate[title]': 'min,max',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertEqual(response.data['meta']['aggregates'], {
+            'id': {'count': 2},
+            'title': {'min': 'A', 'max': 'C'},
+        })
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.get({
+                'aggregate[id]': 'count',
+                'aggregate[title]': 'max',
+                'aggregate_only': 'true',
+            })
+
+        self.assertNotIn('data', response.data)
+        self.assertEqual(response.data['meta']['aggregates'], {
+            'id': {'count': 3},
+            'title': {'max': 'C'},
+        })
+
+    def test_invalid_field(self):
+        response = self.get({'aggregate[tags]': 'count', 'aggregate[foo]': 'count'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            sorted(error['source']['parameter'] for error in response.data['errors']),
+            ['aggregate[foo]', 'aggregate[tags]'],
+        )
+
+    def test_invalid_function(self):
+        response = self.get({'aggregate[title]': 'median'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'aggregate[title]'})
+
+    def test_disabled(self):
+        class View(BookView):
+            aggregate_fields = None
+
+        response = View.as_view()(factory.get('/', {'aggregate[title]': 'max'}))
+        self.assertEqual(response.status_code, 400)
+
+        # the id may always be counted
+        response = View.as_view()(factory.get('/', {'aggregate[id]': 'count'}))
+        self.assertEqual(response.data['meta']['aggregates'], {'id': {'count': 3}})
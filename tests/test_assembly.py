@@ -0,0 +1,73 @@
+import json
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+from json_api import assembly, renderers
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class PersonView(views.ListMixin, views.PersonView):
+    relationships = None
+
+
+class AssembledPersonView(PersonView):
+    assembler_class = assembly.SQLiteResourceAssembler
+
+
+class SQLiteResourceAssemblerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        models.Person.objects.create(name='Bob "Bobby" Robertson', email='bob@example.com')
+        models.Person.objects.create(name='Alice')
+
+    def render(self, view_class, **params):
+        response = view_class.as_view()(factory.get('/', params))
+        self.assertEqual(response.status_code, 200)
+        return json.loads(renderers.APIRenderer().render(response.data).decode('utf-8'))
+
+    def test_assembled_queryset(self):
+        view = AssembledPersonView()
+        queryset = view.get_assembled_queryset(models.Person.objects.order_by('pk'))
+
+        rows = list(queryset)
+        self.assertEqual(len(rows), 2)
+
+        resources = view.get_assembled_resources(rows)
+        self.assertIsInstance(resources[0], renderers.ResourceFragment)
+        self.assertEqual(json.loads(resources[0].content.decode('utf-8')), {
+            'id': rows[0][0],
+            'type': 'person',
+            'attributes': {'name': 'Bob "Bobby" Robertson', 'email': 'bob@example.com'},
+        })
+
+    def test_consistency(self):
+        self.assertEqual(self.render(AssembledPersonView), self.render(PersonView))
+
+    def test_unsupported_fields(self):
+        PersonSerializer = PersonView.serializer_class
+
+        class MethodSerializer(PersonSerializer):
+            upper = serializers.SerializerMethodField()
+
+            def get_upper(self, instance):
+                return instance.name.upper()
+
+        class MethodView(AssembledPersonView):
+            serializer_class = MethodSerializer
+
+        view = MethodView()
+        self.assertIsNone(view.get_assembled_queryset(models.Person.objects.all()))
+
+        # falls back to the resource building pipeline
+        data = self.render(MethodView)
+        self.assertEqual(data['data'][1]['attributes']['upper'], 'ALICE')
+
+    def test_include_paths(self):
+        view = AssembledPersonView()
+        queryset = models.Person.objects.all()
+
+        self.assertIsNone(view.get_assembled_queryset(queryset, ['articles']))
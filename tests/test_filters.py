@@ -3,6 +3,7 @@ from unittest import TestCase as UTestCase
 from django.test import TestCase
 from rest_framework.test import APIRequestFactory
 from rest_framework import serializers
+import django_filters
 from json_api import filters
 from json_api.utils.rels import rel
 
@@ -217,6 +218,22 @@ class RelatedOrderingFilterInterfaceTests(TestCase):
         self.assertEqual(data[0]['attributes']['title'], "Future Dinosaurs")
         self.assertEqual(data[1]['attributes']['title'], "Ancient Aliens")
 
+    def test_to_many_ordering(self):
+        book = models.Book.objects.get(title="Ancient Aliens")
+        book.tags.add(models.Tag.objects.create(text="Alternate History"))
+
+        view = BookView.as_view()
+
+        # ordered by the minimum related value
+        response = view(factory.get('/', {'sort': 'tags.text'}))
+        titles = [r['attributes']['title'] for r in response.data['data']]
+        self.assertEqual(titles, ["Ancient Aliens", "Future Dinosaurs"])
+
+        # ordered by the maximum related value
+        response = view(factory.get('/', {'sort': '-tags.text'}))
+        titles = [r['attributes']['title'] for r in response.data['data']]
+        self.assertEqual(titles, ["Future Dinosaurs", "Ancient Aliens"])
+
     def test_forwards_FK_ordering(self):
         view = BookView.as_view()
         request = factory.get('/', {'sort': 'author'})
@@ -323,3 +340,140 @@ class FieldLookupFilterInterfaceTests(TestCase):
         data = response.data['data']
         self.assertEqual(len(data), 1)
         self.assertEqual(data[0]['attributes']['title'], "Ancient Aliens")
+
+    def test_to_many_lookup(self):
+        class _BookView(BookView):
+            filter_fields = {'tags__text': ['icontains']}
+
+        book = models.Book.objects.get(title="Ancient Aliens")
+        book.tags.add(models.Tag.objects.create(text="Pulp Fiction"))
+
+        view = _BookView.as_view()
+        request = factory.get('/', {'filter[tags__text__icontains]': 'fiction'})
+        response = view(request)
+
+        # the book with two matching tags is not duplicated
+        titles = [r['attributes']['title'] for r in response.data['data']]
+        self.assertEqual(sorted(titles), ["Ancient Aliens", "Future Dinosaurs"])
+
+    def test_to_many_filter_name(self):
+        class BookFilter(filters.FilterSet):
+            tag_text = django_filters.CharFilter(name='tags__text', lookup_expr='icontains')
+
+            class Meta:
+                model = models.Book
+                fields = ['tag_text']
+
+        class _BookView(BookView):
+            filter_class = BookFilter
+
+        book = models.Book.objects.get(title="Ancient Aliens")
+        book.tags.add(models.Tag.objects.create(text="Pulp Fiction"))
+
+        response = _BookView.as_view()(factory.get('/', {'filter[tag_text]': 'fiction'}))
+
+        # the filter's model lookup is to-many, and the book is not duplicated
+        titles = [r['attributes']['title'] for r in response.data['data']]
+        self.assertEqual(sorted(titles), ["Ancient Aliens", "Future Dinosaurs"])
+
+    def test_cached_filter_subset(self):
+        calls = []
+
+        class Filter(filters.FieldLookupFilter):
+            def get_filter_class(self, view, queryset=None):
+                calls.append(1)
+                return super(Filter, self).get_filter_class(view, queryset)
+
+        class _BookView(BookView):
+            filter_backends = (Filter, )
+            filter_fields = ['author', 'title']
+
+        view = _BookView.as_view()
+        for author in (1, 2):
+            response = view(factory.get('/', {'filter[author]': author}))
+            self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(len(calls), 1)
+
+        # a different set of lookups is planned separately
+        response = view(factory.get('/', {'filter[title]': 'Ancient Aliens'}))
+        self.assertEqual(len(response.data['data']), 1)
+        self.assertEqual(len(calls), 2)
+
+    def test_relationship_path(self):
+        class _AuthorView(AuthorView):
+            filter_fields = ['name']
+
+        class _BookView(BookView):
+            relationships = [rel('author', _AuthorView)]
+
+        view = _BookView.as_view()
+        request = factory.get('/', {'filter[author.name]': 'Bob Robertson'})
+        response = view(request)
+
+        data = response.data['data']
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['attributes']['title'], "Ancient Aliens")
+
+    def test_relationship_path_respects_queryset(self):
+        class _AuthorView(AuthorView):
+            filter_fields = ['name']
+            queryset = models.Author.objects.exclude(name='Bob Robertson')
+
+        class _BookView(BookView):
+            relationships = [rel('author', _AuthorView)]
+
+        view = _BookView.as_view()
+        request = factory.get('/', {'filter[author.name]': 'Bob Robertson'})
+        response = view(request)
+
+        self.assertEqual(len(response.data['data']), 0)
+
+    def test_invalid_relationship_path(self):
+        view = BookView.as_view()
+        request = factory.get('/', {'filter[publisher.name]': 'Bob'})
+        response = view(request)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'filter[publisher.name]'})
+
+    def test_facets(self):
+        class _BookView(BookView):
+            filter_fields = ['author', 'title']
+
+        bob = models.Author.objects.get(name="Bob Robertson")
+        charles = models.Author.objects.get(name="Charles Charleston")
+
+        view = _BookView.as_view()
+        request = factory.get('/', {'filter[author]': bob.pk, 'facet[author]': '', 'facet[title]': ''})
+        response = view(request)
+
+        self.assertEqual(len(response.data['data']), 1)
+
+        # the author facet excludes the author filter
+        facets = response.data['meta']['facets']
+        self.assertEqual(facets['author'], [
+            {'value': bob.pk, 'count': 1},
+            {'value': charles.pk, 'count': 1},
+        ])
+        self.assertEqual(facets['title'], [{'value': "Ancient Aliens", 'count': 1}])
+
+    def test_facet_limit(self):
+        class _BookView(BookView):
+            filter_fields = ['title']
+
+        view = _BookView.as_view()
+        response = view(factory.get('/', {'facet[title]': '1'}))
+        self.assertEqual(len(response.data['meta']['facets']['title']), 1)
+
+        response = view(factory.get('/', {'facet[title]': 'a'}))
+        self.assertEqual(response.status_code, 400)
+
+    def test_invalid_facet(self):
+        class _BookView(BookView):
+            filter_fields = ['title']
+
+        view = _BookView.as_view()
+        response = view(factory.get('/', {'facet[author]': ''}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'facet[author]'})
@@ -0,0 +1,169 @@
+import json
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.test import APIRequestFactory
+from json_api import fragments, renderers
+from json_api.utils.rels import rel
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class AuthorView(views.ListMixin, views.AuthorView):
+    fragment_cache_class = fragments.ResourceFragmentCache
+    relationships = [rel('books', 'tests.views.BookView', 'book', count=True)]
+
+
+class TagView(views.ListMixin, views.TagView):
+    fragment_cache_class = fragments.ResourceFragmentCache
+    relationships = None
+
+
+class SourceBookSerializer(views.BookView.serializer_class):
+    author_name = serializers.CharField(source='author.name')
+
+    class Meta(views.BookView.serializer_class.Meta):
+        fields = ['title', 'author_name']
+
+
+class SourceBookView(views.ListMixin, views.BookView):
+    fragment_cache_class = fragments.ResourceFragmentCache
+    serializer_class = SourceBookSerializer
+    relationships = None
+
+
+class CountingCache(object):
+    """
+    Counts the queries of the wrapped cache.
+    """
+    def __init__(self, cache):
+        self.wrapped = cache
+        self.queries = []
+
+    def __getattr__(self, name):
+        method = getattr(self.wrapped, name)
+
+        def query(*args, **kwargs):
+            self.queries.append(name)
+            return method(*args, **kwargs)
+        return query
+
+
+class CountingFragmentCache(fragments.ResourceFragmentCache):
+    counting_cache = CountingCache(cache)
+
+    @property
+    def cache(self):
+        return self.counting_cache
+
+
+class TagListView(views.ListMixin, views.TagView):
+    fragment_cache_class = CountingFragmentCache
+    relationships = None
+
+
+class FragmentCacheTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = models.Author.objects.create(name="Bob")
+        cls.tag = models.Tag.objects.create(text="Fiction")
+
+    def setUp(self):
+        cache.clear()
+        fragments.reset_stats()
+
+    def build(self, view_class, instance, params=None):
+        view = view_class()
+        view.request = view.initialize_request(factory.get('/', params or {}))
+        return view.build_resource(instance)
+
+    def get_stats(self, view_class):
+        return fragments.get_stats()['%s.%s' % (view_class.__module__, view_class.__name__)]
+
+    def test_hit(self):
+        resource = self.build(TagView, self.tag)
+        self.assertIsInstance(resource, dict)
+
+        fragment = self.build(TagView, self.tag)
+        self.assertIsInstance(fragment, renderers.ResourceFragment)
+        self.assertEqual(json.loads(fragment.content.decode('utf-8')), json.loads(json.dumps(resource)))
+
+        self.assertEqual(self.get_stats(TagView), {'hits': 1, 'misses': 1})
+
+    def test_request_variant(self):
+        self.build(TagView, self.tag)
+        resource = self.build(TagView, self.tag, {'link_mode': 'relative'})
+
+        self.assertIsInstance(resource, dict)
+
+    def test_save(self):
+        self.build(TagView, self.tag)
+
+        self.tag.text = "Non-fiction"
+        self.tag.save()
+
+        resource = self.build(TagView, self.tag)
+        self.assertEqual(resource['attributes']['text'], "Non-fiction")
+
+    def test_m2m_changed(self):
+        self.build(TagView, self.tag)
+
+        book = models.Book.objects.create(
+            author=self.author,
+            cover=models.Cover.objects.create(text="Cover"),
+            title="Book",
+        )
+        book.tags.add(self.tag)
+
+        self.assertIsInstance(self.build(TagView, self.tag), dict)
+
+    def test_counted_relationship(self):
+        resource = self.build(AuthorView, self.author)
+        self.assertEqual(resource['relationships']['books']['meta'], {'count': 0})
+
+        models.Book.objects.create(
+            author=self.author,
+            cover=models.Cover.objects.create(text="Cover"),
+            title="Book",
+        )
+
+        resource = self.build(AuthorView, self.author)
+        self.assertEqual(resource['relationships']['books']['meta'], {'count': 1})
+
+    def test_source_changed(self):
+        book = models.Book.objects.create(
+            author=self.author,
+            cover=models.Cover.objects.create(text="Cover"),
+            title="Book",
+        )
+        self.build(SourceBookView, book)
+
+        self.author.name = "Alice"
+        self.author.save()
+
+        resource = self.build(SourceBookView, models.Book.objects.get(pk=book.pk))
+        self.assertIsInstance(resource, dict)
+        self.assertEqual(resource['attributes']['author_name'], "Alice")
+
+    def test_list_queries(self):
+        for text in ("Fantasy", "Horror"):
+            models.Tag.objects.create(text=text)
+
+        def list_tags():
+            queries = CountingFragmentCache.counting_cache.queries = []
+            response = TagListView.as_view()(factory.get('/'))
+            return response, queries
+
+        response, queries = list_tags()
+        self.assertEqual(queries.count('get_many'), 2)
+        self.assertEqual(len(response.data['data']), 3)
+
+        # the versions and fragments of the page are fetched with one query each
+        response, queries = list_tags()
+        self.assertEqual(queries, ['get_many', 'get_many'])
+        data = response.data['data']
+        self.assertTrue(all(isinstance(r, renderers.ResourceFragment) for r in data))
+        self.assertEqual(self.get_stats(TagListView), {'hits': 3, 'misses': 3})
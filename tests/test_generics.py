@@ -1,9 +1,12 @@
 
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
 from json_api import serializers, generics
 from json_api.utils.rels import rel
 
-from tests import models
+from tests import models, views
+
+factory = APIRequestFactory()
 
 
 # forward/reverse relationship testing serializers
@@ -144,3 +147,56 @@ class TestGetRelatedData(TestCase):
             books = view.get_related_data(rel, instance)
             self.assertEqual(books[0].pk, self.book.pk)
             self.assertEqual(books[0].title, self.book.title)
+
+
+class CountedBookView(views.ListMixin, views.BookView):
+    relationships = [
+        rel('author', 'tests.test_generics.AuthorView'),
+        rel('tags', 'tests.test_generics.TagView', count=True),
+    ]
+
+
+class CountedBookDetailView(views.DetailMixin, CountedBookView):
+    pass
+
+
+class TestRelationshipCounts(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = models.Author.objects.create(name="Some author")
+        tags = [models.Tag.objects.create(text=text) for text in ("a", "b", "c")]
+
+        for title, count in [("A", 3), ("B", 0), ("C", 1)]:
+            book = models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+            book.tags.add(*tags[:count])
+
+    def test_annotation(self):
+        view = CountedBookView()
+        queryset = view.annotate_relationship_counts(models.Book.objects.order_by('title'))
+
+        self.assertEqual([book._tags_count for book in queryset], [3, 0, 1])
+
+    def test_list(self):
+        response = CountedBookView.as_view()(factory.get('/'))
+
+        relationships = {
+            r['attributes']['title']: r['relationships'] for r in response.data['data']
+        }
+
+        self.assertEqual(relationships['A']['tags']['meta'], {'count': 3})
+        self.assertEqual(relationships['B']['tags']['meta'], {'count': 0})
+        self.assertEqual(relationships['C']['tags']['meta'], {'count': 1})
+
+        # to-one and uncounted relationships do not have meta
+        self.assertNotIn('meta', relationships['A']['author'])
+
+    def test_retrieve(self):
+        book = models.Book.objects.get(title="A")
+        response = CountedBookDetailView.as_view()(factory.get('/'), pk=book.pk)
+
+        self.assertEqual(response.data['data']['relationships']['tags']['meta'], {'count': 3})
@@ -0,0 +1,64 @@
+from django.test import TestCase
+from django.core.urlresolvers import reverse
+
+
+class LinkModeTests(TestCase):
+    fixtures = ['fantasy-database']
+
+    def get(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_absolute(self):
+        data = self.get(reverse('book-detail', args=[1]))
+
+        self.assertEqual(data['data']['links']['self'], 'http://testserver/books/1/')
+        self.assertEqual(
+            data['data']['relationships']['author']['links']['related'],
+            'http://testserver/books/1/author/',
+        )
+
+    def test_relative(self):
+        data = self.get(reverse('book-detail', args=[1]), link_mode='relative')
+
+        self.assertEqual(data['links']['self'], 'books/1/?link_mode=relative')
+        self.assertEqual(data['data']['links']['self'], 'books/1/')
+        self.assertEqual(data['data']['relationships']['author']['links'], {
+            'self': 'books/1/relationships/author/',
+            'related': 'books/1/author/',
+        })
+
+    def test_none(self):
+        data = self.get(reverse('book-list'), link_mode='none')
+
+        # top-level links are retained, but are relative
+        self.assertEqual(data['links']['self'], 'books/?link_mode=none')
+
+        resource = data['data'][0]
+        self.assertNotIn('links', resource)
+        self.assertNotIn('relationships', resource)
+
+    def test_none_with_linkage(self):
+        data = self.get(reverse('book-detail', args=[1]), link_mode='none', include='author')
+
+        relationships = data['data']['relationships']
+        self.assertEqual(list(relationships.keys()), ['author'])
+        self.assertEqual(relationships['author'], {'data': {'id': 1, 'type': 'author'}})
+
+    def test_invalid(self):
+        response = self.client.get(reverse('book-detail', args=[1]), {'link_mode': 'foo'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'link_mode'})
+
+    def test_viewset_link_mode(self):
+        from json_api.fantasy.views import BookView
+
+        link_mode = BookView.link_mode
+        BookView.link_mode = 'relative'
+        try:
+            data = self.get(reverse('book-detail', args=[1]))
+        finally:
+            BookView.link_mode = link_mode
+
+        self.assertEqual(data['data']['links']['self'], 'books/1/')
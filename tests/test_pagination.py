@@ -0,0 +1,246 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from json_api import filters, pagination
+from json_api.utils.rels import rel
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class CursorPagination(pagination.CursorPagination):
+    page_size = 2
+
+
+class AuthorView(views.ListMixin, views.AuthorView):
+    ordering_fields = '__all__'
+    relationships = None
+
+
+class BookView(views.ListMixin, views.BookView):
+    filter_backends = (filters.RelatedOrderingFilter, )
+    pagination_class = CursorPagination
+    ordering_fields = '__all__'
+
+    relationships = [
+        rel('author', 'tests.test_pagination.AuthorView'),
+    ]
+
+
+class CursorPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        bob = models.Author.objects.create(name="Bob")
+        alice = models.Author.objects.create(name="Alice")
+
+        for title, author in [('E', bob), ('D', alice), ('C', bob), ('B', alice), ('A', bob)]:
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def get(self, params):
+        response = BookView.as_view()(factory.get('/', params))
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def get_param(self, link, param):
+        from django.utils.six.moves.urllib.parse import parse_qs, urlparse
+        return parse_qs(urlparse(link).query)[param][0]
+
+    def titles(self, data):
+        return [resource['attributes']['title'] for resource in data['data']]
+
+    def walk(self, params):
+        titles = []
+        data = self.get(params)
+        titles += self.titles(data)
+
+        while 'next' in data['links']:
+            params['page[after]'] = self.get_param(data['links']['next'], 'page[after]')
+            data = self.get(params)
+            titles += self.titles(data)
+
+        return titles, data
+
+    def test_attribute_ordering(self):
+        titles, data = self.walk({'sort': 'title'})
+        self.assertEqual(titles, ['A', 'B', 'C', 'D', 'E'])
+
+        titles, data = self.walk({'sort': '-title'})
+        self.assertEqual(titles, ['E', 'D', 'C', 'B', 'A'])
+
+    def test_related_ordering(self):
+        # ties are broken by the pk
+        titles, data = self.walk({'sort': 'author.name'})
+        self.assertEqual(titles, ['D', 'B', 'E', 'C', 'A'])
+
+    def test_links(self):
+        data = self.get({'sort': 'title'})
+        self.assertEqual(set(data['links'].keys()), {'self', 'next'})
+
+        titles, data = self.walk({'sort': 'title'})
+        self.assertIn('prev', data['links'])
+        self.assertIn('first', data['links'])
+        self.assertNotIn('next', data['links'])
+        self.assertNotIn('last', data['links'])
+
+    def test_previous(self):
+        titles, data = self.walk({'sort': 'title'})
+        self.assertEqual(self.titles(data), ['E'])
+
+        before = self.get_param(data['links']['prev'], 'page[before]')
+        data = self.get({'sort': 'title', 'page[before]': before})
+        self.assertEqual(self.titles(data), ['C', 'D'])
+
+        before = self.get_param(data['links']['prev'], 'page[before]')
+        data = self.get({'sort': 'title', 'page[before]': before})
+        self.assertEqual(self.titles(data), ['A', 'B'])
+        self.assertNotIn('prev', data['links'])
+
+    def test_invalid_cursor(self):
+        data = self.get({'sort': 'title'})
+        after = self.get_param(data['links']['next'], 'page[after]')
+
+        # cursors are only valid for their ordering
+        response = BookView.as_view()(factory.get('/', {'sort': '-title', 'page[after]': after}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'page[after]'})
+
+        response = BookView.as_view()(factory.get('/', {'page[after]': 'foo'}))
+        self.assertEqual(response.status_code, 400)
+
+
+class PageNumberBookView(views.ListMixin, views.BookView):
+    relationships = None
+
+
+class CountStrategyTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = models.Author.objects.create(name="Bob")
+
+        for title in ['A', 'B', 'C', 'D', 'E']:
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def get(self, count_class, params=None):
+        class Pagination(pagination.PageNumberPagination):
+            page_size = 2
+            include_count = True
+
+        Pagination.count_class = count_class
+
+        class View(PageNumberBookView):
+            pagination_class = Pagination
+
+        response = View.as_view()(factory.get('/', params or {}))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_exact(self):
+        data = self.get(pagination.ExactCount)
+
+        self.assertEqual(data['meta'], {'count': 5})
+        self.assertIn('last', data['links'])
+        self.assertIn('next', data['links'])
+
+    def test_capped(self):
+        class CappedCount(pagination.CappedCount):
+            cap = 3
+
+        data = self.get(CappedCount)
+        self.assertEqual(data['meta'], {'count': '3+'})
+        self.assertNotIn('last', data['links'])
+        self.assertIn('next', data['links'])
+
+        # pages beyond the cap are still available
+        data = self.get(CappedCount, {'page': 3})
+        self.assertEqual(len(data['data']), 1)
+        self.assertNotIn('next', data['links'])
+
+    def test_capped_exact(self):
+        class CappedCount(pagination.CappedCount):
+            cap = 10
+
+        data = self.get(CappedCount)
+        self.assertEqual(data['meta'], {'count': 5})
+        self.assertIn('last', data['links'])
+
+    def test_cached(self):
+        from django.core.cache import cache
+        cache.clear()
+
+        data = self.get(pagination.CachedCount)
+        self.assertEqual(data['meta'], {'count': 5})
+
+        # the cached count is used
+        models.Book.objects.filter(title='E').delete()
+        data = self.get(pagination.CachedCount)
+        self.assertEqual(data['meta'], {'count': 5})
+
+    def test_estimated_fallback(self):
+        # SQLite has no estimate, and falls back to an exact count.
+        data = self.get(pagination.EstimatedCount)
+        self.assertEqual(data['meta'], {'count': 5})
+        self.assertIn('last', data['links'])
+
+
+class HasNextPaginationTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        author = models.Author.objects.create(name="Bob")
+
+        for title in ['A', 'B', 'C', 'D', 'E']:
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def get(self, params=None):
+        class Pagination(pagination.HasNextPagination):
+            page_size = 2
+
+        class View(PageNumberBookView):
+            pagination_class = Pagination
+
+        return View.as_view()(factory.get('/', params or {}))
+
+    def test_first_page(self):
+        with self.assertNumQueries(1):
+            response = self.get()
+
+        self.assertEqual([b['attributes']['title'] for b in response.data['data']], ['A', 'B'])
+        links = response.data['links']
+        self.assertIn('next', links)
+        self.assertNotIn('prev', links)
+        self.assertNotIn('last', links)
+        self.assertNotIn('meta', response.data)
+
+    def test_last_page(self):
+        response = self.get({'page': 3})
+
+        self.assertEqual([b['attributes']['title'] for b in response.data['data']], ['E'])
+        links = response.data['links']
+        self.assertIn('prev', links)
+        self.assertNotIn('next', links)
+        self.assertNotIn('last', links)
+
+    def test_full_last_page(self):
+        models.Book.objects.filter(title='E').delete()
+        response = self.get({'page': 2})
+
+        self.assertEqual(len(response.data['data']), 2)
+        self.assertNotIn('next', response.data['links'])
+
+    def test_invalid_page(self):
+        self.assertEqual(self.get({'page': 4}).status_code, 404)
+        self.assertEqual(self.get({'page': 'foo'}).status_code, 404)
@@ -0,0 +1,419 @@
+import io
+import json
+import datetime
+from unittest import TestCase as UTestCase, skipIf
+from collections import OrderedDict
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from django.utils import timezone
+from json_api import inclusion, parsers, renderers
+from json_api.utils import processes
+from json_api.utils.rels import rel
+
+from django_fantasy import models as fantasy_models
+from json_api.fantasy import views as fantasy_views
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class PersonView(views.ListMixin, views.PersonView):
+    streaming = True
+    inclusion_class = inclusion.RelatedResourceInclusion
+    include_rels = '__all__'
+    pagination_class = None
+
+    relationships = [
+        rel('articles', 'tests.test_renderers.ArticleView', 'article'),
+    ]
+
+
+class ArticleView(views.ListMixin, views.ArticleView):
+    relationships = [
+        rel('author', 'tests.test_renderers.PersonView'),
+    ]
+
+
+class APIRendererStreamTests(UTestCase):
+
+    def setUp(self):
+        self.renderer = renderers.APIRenderer()
+
+    def render(self, data):
+        return b''.join(self.renderer.render_stream(data)).decode('utf-8')
+
+    def test_plain_document(self):
+        data = OrderedDict((('links', {'self': 'a'}), ('data', [1, 2])))
+        self.assertEqual(json.loads(self.render(data)), data)
+
+    def test_iterator_values(self):
+        data = OrderedDict((
+            ('data', iter([{'id': 1}, {'id': 2}])),
+            ('included', iter([{'id': 3}])),
+        ))
+
+        self.assertEqual(
+            json.loads(self.render(data)),
+            {'data': [{'id': 1}, {'id': 2}], 'included': [{'id': 3}]},
+        )
+
+    def test_empty_iterators(self):
+        data = OrderedDict((
+            ('data', iter([])),
+            ('included', iter([])),
+        ))
+
+        self.assertEqual(json.loads(self.render(data)), {'data': []})
+
+    def test_chunk_size(self):
+        self.renderer.chunk_size = 1
+        data = OrderedDict((('data', iter([{'id': 1}, {'id': 2}])), ))
+
+        chunks = list(self.renderer.render_stream(data))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(json.loads(b''.join(chunks).decode('utf-8')), {'data': [{'id': 1}, {'id': 2}]})
+
+
+class StreamingListTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        person = models.Person.objects.create(name='Bob')
+        models.Article.objects.create(author=person, title='Some article')
+        models.Person.objects.create(name='Alice')
+
+    def test_streaming_response(self):
+        view = PersonView.as_view()
+        response = view(factory.get('/', {'include': 'articles'}))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], renderers.APIRenderer.media_type)
+
+        content = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual([r['attributes']['name'] for r in content['data']], ['Bob', 'Alice'])
+        self.assertEqual(len(content['included']), 1)
+        self.assertEqual(content['included'][0]['attributes']['title'], 'Some article')
+
+    def test_prefetched_chunks(self):
+        view = PersonView()
+        view.stream_chunk_size = 1
+        queryset = models.Person.objects.order_by('name').prefetch_related('article_set')
+
+        # `iterator()` does not prefetch, so the lookups are applied per chunk
+        with self.assertNumQueries(3):
+            chunks = list(view.iter_queryset_chunks(queryset))
+            titles = [
+                [article.title for article in person.article_set.all()]
+                for chunk in chunks for person in chunk
+            ]
+
+        self.assertEqual([len(chunk) for chunk in chunks], [1, 1])
+        self.assertEqual(titles, [[], ['Some article']])
+
+    def test_included_chunks(self):
+        models.Person.objects.create(name='Carol')
+        chunks = []
+
+        class View(PersonView):
+            stream_chunk_size = 2
+
+            def get_included_data(self, data, paths):
+                chunks.append([instance.name for instance in data])
+                return super(View, self).get_included_data(data, paths)
+
+        response = View.as_view()(factory.get('/', {'include': 'articles'}))
+        content = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+
+        # the included data is collected per chunk of instances, not per instance
+        self.assertEqual(chunks, [['Bob', 'Alice'], ['Carol']])
+        self.assertEqual(len(content['included']), 1)
+
+
+class ResourceFragmentTests(UTestCase):
+
+    def setUp(self):
+        self.renderer = renderers.APIRenderer()
+
+    def test_identity(self):
+        fragment = renderers.ResourceFragment(1, 'person', b'{}')
+        self.assertEqual(fragment['id'], 1)
+        self.assertEqual(fragment['type'], 'person')
+
+        with self.assertRaises(KeyError):
+            fragment['attributes']
+
+    def test_splicing(self):
+        # fragment content is not re-encoded
+        fragment = renderers.ResourceFragment(1, 'person', b'{"id":1,"type":"person","spliced":true}')
+        data = OrderedDict((
+            ('data', [fragment, {'id': 2, 'type': 'person'}]),
+        ))
+
+        content = self.renderer.render(data)
+        self.assertIn(fragment.content, content)
+        self.assertEqual(json.loads(content.decode('utf-8')), {'data': [
+            {'id': 1, 'type': 'person', 'spliced': True},
+            {'id': 2, 'type': 'person'},
+        ]})
+
+    def test_encode(self):
+        resource = OrderedDict((('id', 1), ('type', 'person')))
+        fragment = renderers.ResourceFragment.encode(resource, self.renderer)
+
+        self.assertEqual(fragment['id'], 1)
+        self.assertEqual(json.loads(fragment.content.decode('utf-8')), resource)
+
+
+class FragmentPersonView(views.PersonView):
+    fragments = {}
+    relationships = None
+
+    def get_resource_links(self, *args, **kwargs):
+        return {}
+
+    def get_resource_version(self, instance):
+        return 1
+
+    def get_resource_fragment(self, resource_type, resource_id, version):
+        return self.fragments.get((resource_type, resource_id, version))
+
+    def set_resource_fragment(self, fragment, version):
+        self.fragments[(fragment.type, fragment.id, version)] = fragment
+
+
+class BuildResourceFragmentTests(TestCase):
+
+    def test_build_resource(self):
+        person = models.Person.objects.create(name='Bob')
+        view = FragmentPersonView()
+
+        resource = view.build_resource(person)
+        self.assertIsInstance(resource, dict)
+        self.assertIn(('person', person.pk, 1), view.fragments)
+
+        fragment = view.build_resource(person)
+        self.assertIsInstance(fragment, renderers.ResourceFragment)
+        self.assertEqual(json.loads(fragment.content.decode('utf-8')), resource)
+
+
+@skipIf(renderers.msgpack is None, 'msgpack is not installed')
+class MessagePackTests(UTestCase):
+
+    def setUp(self):
+        self.renderer = renderers.MessagePackRenderer()
+        self.parser = parsers.MessagePackParser()
+
+    def roundtrip(self, data):
+        content = self.renderer.render(data)
+        return self.parser.parse(io.BytesIO(content))
+
+    def test_document(self):
+        data = OrderedDict((
+            ('data', [OrderedDict((
+                ('id', 1),
+                ('type', 'person'),
+                ('attributes', {'name': 'Bob', 'score': 1.5}),
+            ))]),
+        ))
+
+        self.assertEqual(self.roundtrip(data), data)
+
+    def test_compact(self):
+        data = {'data': [{'id': i, 'type': 'person'} for i in range(100)]}
+
+        msgpack_content = self.renderer.render(data)
+        json_content = renderers.APIRenderer().render(data)
+        self.assertLess(len(msgpack_content), len(json_content))
+
+    def test_datetimes(self):
+        now = timezone.now()
+        today = datetime.date.today()
+
+        data = self.roundtrip({'now': now, 'today': today})
+        self.assertEqual(data['now'], now)
+        self.assertEqual(data['today'], today.isoformat())
+
+    def test_fragments(self):
+        fragment = renderers.ResourceFragment(1, 'person', b'{"id":1,"type":"person"}')
+
+        self.assertEqual(self.roundtrip({'data': [fragment]}), {'data': [{'id': 1, 'type': 'person'}]})
+
+
+class ColumnarRendererTests(UTestCase):
+
+    def setUp(self):
+        self.renderer = renderers.ColumnarRenderer()
+
+    def render(self, data):
+        return json.loads(self.renderer.render(data).decode('utf-8'))
+
+    def test_columns(self):
+        data = OrderedDict((
+            ('links', {'self': 'a'}),
+            ('data', [
+                {
+                    'id': 1, 'type': 'article', 'links': {'self': 'b'},
+                    'attributes': {'title': 'a'},
+                    'relationships': {
+                        'author': {'data': {'id': 1, 'type': 'person'}},
+                        'comments': {'links': {}},
+                    },
+                },
+                {
+                    'id': 2, 'type': 'article',
+                    'attributes': {'title': 'b'},
+                    'relationships': {'author': {'data': None}},
+                },
+            ]),
+            ('included', [
+                {'id': 1, 'type': 'person', 'attributes': {'name': 'Bob'}},
+            ]),
+        ))
+
+        self.assertEqual(self.render(data), {
+            'links': {'self': 'a'},
+            'data': {
+                'article': {
+                    'id': [1, 2],
+                    'attributes': {'title': ['a', 'b']},
+                    'relationships': {'author': [1, None]},
+                },
+            },
+            'included': {
+                'person': {
+                    'id': [1],
+                    'attributes': {'name': ['Bob']},
+                },
+            },
+        })
+
+    def test_missing_attributes(self):
+        data = {'data': [
+            {'id': 1, 'type': 'person', 'attributes': {'name': 'Bob'}},
+            {'id': 2, 'type': 'person', 'attributes': {'email': 'a@b.c'}},
+        ]}
+
+        self.assertEqual(self.render(data)['data']['person']['attributes'], {
+            'name': ['Bob', None],
+            'email': [None, 'a@b.c'],
+        })
+
+    def test_to_many_linkage(self):
+        data = {'data': {
+            'id': 1, 'type': 'person',
+            'relationships': {'articles': {'data': [{'id': 1, 'type': 'article'}, {'id': 2, 'type': 'article'}]}},
+        }}
+
+        self.assertEqual(self.render(data)['data']['person']['relationships'], {'articles': [[1, 2]]})
+
+    def test_errors(self):
+        data = {'errors': [{'status': 400}]}
+        self.assertEqual(self.render(data), data)
+
+
+class ProcessPersonView(views.ListMixin, views.PersonView):
+    relationships = None
+    render_processes = 2
+    render_chunk_size = 2
+
+
+class ProcessAuthorView(views.ListMixin, views.AuthorView):
+    relationships = [rel('books', 'tests.views.BookView', 'book', count=True)]
+    render_processes = 2
+    render_chunk_size = 2
+
+
+class ProcessFantasyAuthorView(fantasy_views.AuthorView):
+    pagination_class = None
+    render_processes = 2
+    render_chunk_size = 1
+
+
+class ProcessPoolRenderingTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for name in ['Alice', 'Bob', 'Charles', 'Dave', 'Eve']:
+            models.Person.objects.create(name=name)
+
+    def render(self, view_class):
+        response = view_class.as_view()(factory.get('/'))
+        return json.loads(renderers.APIRenderer().render(response.data).decode('utf-8'))
+
+    def test_process_pool(self):
+        view = ProcessPersonView()
+        view.request = factory.get('/')
+        view.request.resolver_match = None
+
+        resources = view.build_resources(models.Person.objects.order_by('pk'))
+        self.assertEqual(len(resources), 5)
+        self.assertTrue(all(isinstance(r, renderers.ResourceFragment) for r in resources))
+
+    def test_shared_pool(self):
+        self.assertIs(processes.get_pool(2), processes.get_pool(2))
+
+    def test_relationship_counts(self):
+        for name in ['Alice', 'Bob', 'Charles']:
+            author = models.Author.objects.create(name=name)
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=name),
+                title=name,
+            )
+
+        view = ProcessAuthorView()
+        view.request = factory.get('/')
+        view.request.resolver_match = None
+
+        # the annotated counts are sent to the workers, which would otherwise
+        # query the (in-memory) test database.
+        queryset = view.annotate_relationship_counts(models.Author.objects.order_by('pk'))
+        resources = [json.loads(r.content.decode('utf-8')) for r in view.build_resources(queryset)]
+
+        self.assertEqual([r['relationships']['books']['meta'] for r in resources], [{'count': 1}] * 3)
+
+    def test_link_mode(self):
+        for name in ['Alice', 'Bob', 'Charles']:
+            fantasy_models.Author.objects.create(name=name, date_of_birth=datetime.date(1900, 1, 1))
+
+        def render(view_class):
+            view = view_class.as_view({'get': 'list'})
+            response = view(factory.get(reverse('author-list'), {'link_mode': 'relative'}))
+            return json.loads(renderers.APIRenderer().render(response.data).decode('utf-8'))
+
+        class SerialAuthorView(ProcessFantasyAuthorView):
+            render_processes = None
+
+        data = render(ProcessFantasyAuthorView)
+        self.assertEqual(data, render(SerialAuthorView))
+        self.assertTrue(data['data'][0]['links']['self'].startswith('authors/'))
+
+    def test_request_state(self):
+        user = User.objects.create(username='bob')
+        request = ProcessFantasyAuthorView(action_map={'get': 'list'}).initialize_request(
+            factory.get(reverse('author-list'), {'link_mode': 'none'})
+        )
+        request.user = user
+
+        # the worker's view is built for the query params and user of the request
+        request_state = processes.get_request_state(request)
+        view = processes.get_view(ProcessFantasyAuthorView, request_state, 'list')
+        self.assertEqual(view.get_link_mode(), 'none')
+        self.assertEqual(view.request.user, user)
+        self.assertEqual(view.action, 'list')
+
+    def test_ordering(self):
+        class SerialPersonView(ProcessPersonView):
+            render_processes = None
+
+        self.assertEqual(self.render(ProcessPersonView), self.render(SerialPersonView))
+
+    def test_small_page(self):
+        class LargeChunkPersonView(ProcessPersonView):
+            render_chunk_size = 10
+
+        view = LargeChunkPersonView()
+        resources = view.build_resources(models.Person.objects.all())
+        self.assertTrue(all(isinstance(r, dict) for r in resources))
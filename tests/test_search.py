@@ -0,0 +1,127 @@
+import sqlite3
+from unittest import skipIf
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils.six import StringIO
+from rest_framework.test import APIRequestFactory
+from json_api import filters, search
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+def has_fts5():
+    try:
+        sqlite3.connect(':memory:').execute('CREATE VIRTUAL TABLE t USING fts5(a)')
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+class SearchBookView(views.ListMixin, views.BookView):
+    filter_backends = (filters.RelatedOrderingFilter, search.FullTextSearchFilter)
+    ordering_fields = '__all__'
+    search_fields = ('title', )
+    relationships = None
+
+
+@skipIf(not has_fts5(), 'SQLite FTS5 is not available')
+class FullTextSearchTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # the index is created outside of the test transactions, as DDL commits
+        # the open transaction on Python 2.
+        search.register(SearchBookView).create()
+        super(FullTextSearchTests, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(FullTextSearchTests, cls).tearDownClass()
+
+        index = search.register(SearchBookView)
+        search.unregister(SearchBookView)
+        with connection.cursor() as cursor:
+            cursor.execute('DROP TABLE %s' % index.table)
+
+    @classmethod
+    def setUpTestData(cls):
+        author = models.Author.objects.create(name="Bob")
+        for title in ["Ancient Aliens", "Future Dinosaurs of the Past Era", "Dinosaurs Dinosaurs"]:
+            models.Book.objects.create(
+                author=author,
+                cover=models.Cover.objects.create(text=title),
+                title=title,
+            )
+
+    def get_titles(self, params):
+        response = SearchBookView.as_view()(factory.get('/', params))
+        self.assertEqual(response.status_code, 200)
+        return [r['attributes']['title'] for r in response.data['data']]
+
+    def test_search(self):
+        self.assertEqual(self.get_titles({'filter[search]': 'aliens'}), ["Ancient Aliens"])
+        self.assertEqual(self.get_titles({'filter[search]': 'ancient dinosaurs'}), [])
+
+    def test_query_syntax(self):
+        # FTS5 operators are not interpreted
+        self.assertEqual(self.get_titles({'filter[search]': 'aliens"  OR'}), [])
+
+    def test_relevance(self):
+        titles = self.get_titles({'filter[search]': 'dinosaurs', 'sort': '-relevance'})
+        self.assertEqual(titles, ["Dinosaurs Dinosaurs", "Future Dinosaurs of the Past Era"])
+
+        titles = self.get_titles({'filter[search]': 'dinosaurs', 'sort': 'relevance'})
+        self.assertEqual(titles, ["Future Dinosaurs of the Past Era", "Dinosaurs Dinosaurs"])
+
+    def test_attribute_sort(self):
+        titles = self.get_titles({'sort': '-title'})
+        self.assertEqual(titles, ["Future Dinosaurs of the Past Era", "Dinosaurs Dinosaurs", "Ancient Aliens"])
+
+    def test_search_before_build(self):
+        class View(SearchBookView):
+            search_table = 'tests_book_unbuilt_fts'
+
+        index = search.register(View)
+        try:
+            # changes are not indexed, and searches fall back to `icontains` lookups
+            book = models.Book.objects.get(title="Ancient Aliens")
+            book.title = "Ancient Aliens!"
+            book.save()
+
+            response = View.as_view()(factory.get('/', {'filter[search]': 'aliens'}))
+            titles = [r['attributes']['title'] for r in response.data['data']]
+
+            self.assertEqual(titles, ["Ancient Aliens!"])
+            self.assertFalse(index.exists())
+        finally:
+            search.unregister(View)
+
+    def test_relevance_without_search(self):
+        self.assertEqual(len(self.get_titles({'sort': '-relevance'})), 3)
+
+    def test_signals(self):
+        book = models.Book.objects.get(title="Ancient Aliens")
+        book.title = "Modern Aliens"
+        book.save()
+
+        self.assertEqual(self.get_titles({'filter[search]': 'ancient'}), [])
+        self.assertEqual(self.get_titles({'filter[search]': 'modern'}), ["Modern Aliens"])
+
+        book.delete()
+        self.assertEqual(self.get_titles({'filter[search]': 'aliens'}), [])
+
+    def test_build_command(self):
+        index = search.register(SearchBookView)
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM %s' % index.table)
+
+        self.assertEqual(self.get_titles({'filter[search]': 'aliens'}), [])
+
+        out = StringIO()
+        call_command('build_search_index', 'tests.test_search.SearchBookView', stdout=out)
+
+        self.assertIn('Indexed 3 rows', out.getvalue())
+        self.assertEqual(self.get_titles({'filter[search]': 'aliens'}), ["Ancient Aliens"])
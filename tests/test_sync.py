@@ -0,0 +1,94 @@
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from json_api import sync
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class CommentView(views.ListMixin, views.CommentView):
+    sync_field = 'updated'
+    relationships = None
+
+    def get_sync_scope(self, instance):
+        return instance.article_id
+
+    def get_sync_scopes(self):
+        scope = self.request.query_params.get('scope')
+        return [scope] if scope else None
+
+
+class UserCommentView(CommentView):
+    def get_queryset(self):
+        # depends on the request, and cannot be called on registration
+        assert self.request.user is not None
+        return super(UserCommentView, self).get_queryset()
+
+
+class SyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sync.register(CommentView)
+
+        author = models.Person.objects.create(name="Bob")
+        article = cls.article = models.Article.objects.create(author=author, title="Article")
+        for body in ("a", "b", "c"):
+            models.Comment.objects.create(author=author, article=article, body=body)
+
+    def sync(self, cursor='', **params):
+        params['filter[updated_since]'] = cursor
+        response = CommentView.as_view()(factory.get('/', params))
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_initial_sync(self):
+        data = self.sync()
+
+        self.assertEqual([r['attributes']['body'] for r in data['data']], ["a", "b", "c"])
+        self.assertEqual(data['meta']['deleted'], [])
+        self.assertTrue(data['meta']['cursor'])
+
+    def test_incremental_sync(self):
+        cursor = self.sync()['meta']['cursor']
+
+        comment = models.Comment.objects.get(body="b")
+        comment.body = "B"
+        comment.save()
+
+        deleted = models.Comment.objects.get(body="c")
+        deleted_pk = deleted.pk
+        deleted.delete()
+
+        data = self.sync(cursor)
+        self.assertEqual([r['attributes']['body'] for r in data['data']], ["B"])
+        self.assertEqual(data['meta']['deleted'], [deleted_pk])
+
+        # nothing has changed since the last sync
+        data = self.sync(data['meta']['cursor'])
+        self.assertEqual(data['data'], [])
+        self.assertEqual(data['meta']['deleted'], [])
+
+    def test_scoped_tombstones(self):
+        cursor = self.sync()['meta']['cursor']
+
+        other = models.Article.objects.create(author=self.article.author, title="Other")
+        deleted = models.Comment.objects.create(author=self.article.author, article=other, body="d")
+        deleted_pk = deleted.pk
+        deleted.delete()
+
+        self.assertEqual(self.sync(cursor, scope=self.article.pk)['meta']['deleted'], [])
+        self.assertEqual(self.sync(cursor, scope=other.pk)['meta']['deleted'], [deleted_pk])
+
+    def test_request_queryset(self):
+        response = UserCommentView.as_view()(factory.get('/', {'filter[updated_since]': ''}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['data']), 3)
+
+    def test_invalid_cursor(self):
+        response = CommentView.as_view()(factory.get('/', {'filter[updated_since]': 'abc'}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['source'], {'parameter': 'filter[updated_since]'})
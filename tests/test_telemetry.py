@@ -0,0 +1,97 @@
+import os
+import json
+import multiprocessing
+import shutil
+import tempfile
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils.six import StringIO
+from rest_framework.test import APIRequestFactory
+from json_api import filters, telemetry
+
+from tests import views, models
+
+factory = APIRequestFactory()
+
+
+class BookView(views.ListMixin, views.BookView):
+    filter_backends = (filters.RelatedOrderingFilter, filters.FieldLookupFilter, )
+    filter_fields = ['author', 'title']
+    ordering_fields = '__all__'
+    relationships = None
+
+
+def flush_usage(path):
+    aggregator = telemetry.UsageAggregator(path, interval=3600)
+    for _ in range(10):
+        aggregator.record('view', {'sort': ['title']}, 0.5)
+        aggregator.flush()
+
+
+class TelemetryTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'usage.json')
+        self.aggregator = telemetry._aggregator = telemetry.UsageAggregator(self.path, interval=3600)
+
+    def tearDown(self):
+        telemetry._aggregator = None
+        shutil.rmtree(self.directory)
+
+    def test_flush(self):
+        self.aggregator.record('view', {'sort': ['title']}, 0.5)
+        self.aggregator.record('view', {'sort': ['title']}, 0.25)
+        self.aggregator.flush()
+
+        # flushed data is merged into the file
+        self.aggregator.record('view', {'sort': ['title']}, 0.25)
+        self.aggregator.flush()
+
+        usage = telemetry.UsageAggregator.load(self.path)
+        self.assertEqual(usage, {'view': {'{"sort": ["title"]}': {'count': 3, 'time': 1.0}}})
+
+    def test_concurrent_flush(self):
+        workers = [multiprocessing.Process(target=flush_usage, args=(self.path, )) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        # the flushes of each process are merged into the file
+        usage = telemetry.UsageAggregator.load(self.path)
+        self.assertEqual(usage['view']['{"sort": ["title"]}'], {'count': 40, 'time': 20.0})
+
+    def test_record_view(self):
+        view = BookView.as_view()
+        view(factory.get('/', {'filter[title]': 'a', 'filter[author]': 1, 'sort': '-title'}))
+        view(factory.get('/', {'filter[title]': 'b', 'filter[author]': 2, 'sort': '-title'}))
+        view(factory.get('/'))
+        self.aggregator.flush()
+
+        usage = telemetry.UsageAggregator.load(self.path)
+        shapes = usage['tests.test_telemetry.BookView']
+
+        self.assertEqual(len(shapes), 1)
+        shape, stats = list(shapes.items())[0]
+        self.assertEqual(json.loads(shape), {'filter': ['author', 'title'], 'sort': ['-title']})
+        self.assertEqual(stats['count'], 2)
+
+    def test_index_proposals(self):
+        shape = json.dumps({'filter': ['author', 'title__icontains'], 'sort': ['-cover__text']})
+        usage = {'tests.test_telemetry.BookView': {shape: {'count': 2, 'time': 1.5}}}
+
+        proposals = telemetry.get_index_proposals(usage)
+        self.assertEqual(sorted(proposals, key=lambda p: p[1]), [
+            (models.Book, ('author', 'title'), 2, 1.5),
+            (models.Cover, ('text', ), 2, 1.5),
+            (models.Book, ('title', ), 2, 1.5),
+        ])
+
+    def test_advise_command(self):
+        BookView.as_view()(factory.get('/', {'filter[title]': 'a'}))
+        self.aggregator.flush()
+
+        out = StringIO()
+        call_command('advise_indexes', file=self.path, stdout=out)
+        self.assertIn('tests.Book.title: db_index=True  (1 requests', out.getvalue())
@@ -4,13 +4,14 @@ from django.test import TestCase
 from rest_framework import serializers
 
 from json_api.utils import import_class
+from json_api.utils.plans import LRUCache, get_plan
 from json_api.utils.model_meta import get_field_info, verbose_name
-from json_api.utils.view_meta import get_field_attnames
+from json_api.utils.view_meta import get_field_attnames, get_related_paths
 from json_api.utils.rels import rel
 from json_api.utils.types import subtype
 
 from tests.models import Parent, Child, Proxy, Related
-from tests.views import BookView
+from tests.views import AuthorView, BookView
 
 
 class Import:
@@ -135,3 +136,78 @@ class TestViewMeta(TestCase):
             'author': 'foo',
         }
         self.assertEqual(actual, expected)
+
+    def test_related_paths(self):
+        BookSerializer = BookView.serializer_class
+
+        class RelatedBookSerializer(BookSerializer):
+            author_name = serializers.CharField(source='author.name')
+            cover_id = serializers.PrimaryKeyRelatedField(source='cover', read_only=True)
+            tag_names = serializers.StringRelatedField(source='tags', many=True)
+
+            class Meta(BookSerializer.Meta):
+                fields = ['title', 'author_name', 'cover_id', 'tag_names']
+
+        class RelatedBookView(BookView):
+            serializer_class = RelatedBookSerializer
+
+        select_related, prefetch_related = get_related_paths(RelatedBookView)
+        self.assertEqual(select_related, ['author'])
+        self.assertEqual(prefetch_related, ['tags'])
+
+    def test_related_paths_reverse(self):
+        AuthorSerializer = AuthorView.serializer_class
+
+        class RelatedAuthorSerializer(AuthorSerializer):
+            book_titles = serializers.StringRelatedField(source='book_set', many=True)
+
+            class Meta(AuthorSerializer.Meta):
+                fields = ['name', 'book_titles']
+
+        class RelatedAuthorView(AuthorView):
+            serializer_class = RelatedAuthorSerializer
+
+        select_related, prefetch_related = get_related_paths(RelatedAuthorView)
+        self.assertEqual(select_related, [])
+        self.assertEqual(prefetch_related, ['book_set'])
+
+
+class TestPlans(UTestCase):
+
+    def test_lru_eviction(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+
+        # 'a' is now the most recently used
+        self.assertEqual(cache.get('a'), 1)
+        cache.set('c', 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_disabled(self):
+        cache = LRUCache(0)
+        cache.set('a', 1)
+        self.assertIsNone(cache.get('a'))
+
+    def test_get_plan(self):
+        class View(AuthorView):
+            pass
+
+        calls = []
+
+        def build():
+            calls.append(1)
+            return None
+
+        # `None` is a valid plan
+        self.assertIsNone(get_plan(View(), 'key', build))
+        self.assertIsNone(get_plan(View(), 'key', build))
+        self.assertEqual(len(calls), 1)
+
+        # plans are cached per view class
+        get_plan(AuthorView(), 'key', build)
+        self.assertEqual(len(calls), 2)